@@ -10,6 +10,7 @@ import os
 # Add src to path
 sys.path.insert(0, os.path.dirname(__file__))
 
+from src.api import app as app_module
 from src.api.app import app, initialize_world
 
 
@@ -21,9 +22,9 @@ def main():
     print("=" * 60)
     print()
     
-    # Initialize world
+    # The app module already loaded the world on import
     print("Initializing world...")
-    world_state = initialize_world()
+    world_state = app_module.world_state or initialize_world()
     
     print(f"✓ Loaded {len(world_state.characters)} characters:")
     for char in world_state.characters.values():
@@ -1,18 +1,28 @@
 """
 Flask web application for the autonomous world system.
 """
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, Response
 import os
+import gzip
 import json
+import queue
+import threading
+import time
 from datetime import datetime
 from typing import Dict
 
 from src.engine.world_state import WorldState
+from src.engine.world_watcher import WorldWatcher
+from src.api.map_stream import MapBroadcaster
 from src.engine.simulation import Simulation, SimulationConfig
 from src.models.interaction import Interaction
+from src.models.interaction_store import get_interaction_store
+from src.models.memory_store import MemoryCapacity
 from src.engine.prompt_extractor import PromptExtractor
 from src.engine.quality_analyzer import QualityAnalyzer
 from src.generators.description_generator import LLM_STATUS
+from src.llm.gateway import Priority, get_gateway
+from src.utils.config_loader import ConfigLoader
 
 
 app = Flask(__name__, 
@@ -22,20 +32,40 @@ app = Flask(__name__,
 # Global simulation state
 current_simulation: Simulation = None
 world_state: WorldState = None
+world_watcher: WorldWatcher = None
+map_broadcaster: MapBroadcaster = None
 
 
 def initialize_world():
     """Initialize the world state from data files."""
-    global world_state
+    global world_state, world_watcher, map_broadcaster
     
     base_dir = os.path.join(os.path.dirname(__file__), '..', '..')
-    characters_dir = os.path.join(base_dir, 'data', 'characters')
-    locations_dir = os.path.join(base_dir, 'data', 'locations')
+    data_dir = os.path.join(base_dir, 'data')
     
-    characters = WorldState.load_characters_from_directory(characters_dir)
-    locations = WorldState.load_locations_from_directory(locations_dir)
+    config = ConfigLoader()
+    journal_dir = config.get("memory.journal_dir")
+    characters, locations = WorldState.load_world(data_dir, journal_dir)
     
-    world_state = WorldState(characters, locations)
+    world_state = WorldState(characters, locations,
+                             memory_capacity=MemoryCapacity.from_config(config),
+                             interaction_store=get_interaction_store(config))
+    
+    # Edits under data/ are merged into the live world without a reset
+    if world_watcher is None:
+        world_watcher = WorldWatcher(world_state, data_dir,
+                                     interval=config.get("server.hot_reload_interval", 1.0),
+                                     journal_dir=journal_dir)
+        if config.get("server.hot_reload", True):
+            world_watcher.start()
+    else:
+        world_watcher.world_state = world_state
+    
+    # Map streams follow the new world
+    if map_broadcaster is None:
+        map_broadcaster = MapBroadcaster(
+            _map_payload, frame_seconds=config.get("server.map_frame_ms", 100) / 1000)
+    map_broadcaster.attach(world_state)
     return world_state
 
 
@@ -55,12 +85,90 @@ def map_view():
     return render_template('map.html')
 
 
+# Map streams are recycled so a worker thread is never held indefinitely
+STREAM_MAX_SECONDS = 240
+STREAM_KEEPALIVE_SECONDS = 15
+
+# Bodies at least this large are gzipped for clients that accept it
+GZIP_MIN_BYTES = 1024
+
+# endpoint -> [ETag, serialized body, gzipped body or None] for the world
+# version it was built at
+_response_cache: Dict[str, list] = {}
+
+
+def _json_response(body: bytes, cached: list = None) -> Response:
+    """
+    Respond with an already-serialized JSON body, gzipped when it is large
+    and the client accepts gzip. `cached` ([..., body, gzipped]) keeps the
+    compressed copy for reuse.
+    """
+    if len(body) < GZIP_MIN_BYTES or request.accept_encodings['gzip'] <= 0:
+        response = Response(body, mimetype='application/json')
+    else:
+        compressed = cached[2] if cached else None
+        if compressed is None:
+            compressed = gzip.compress(body, compresslevel=5)
+            if cached:
+                cached[2] = compressed
+        response = Response(compressed, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _interaction_array(interactions) -> bytes:
+    """JSON array of interactions, joined from their cached serializations."""
+    return b'[' + b','.join(interaction.to_json() for interaction in interactions) + b']'
+
+
+def _interactions_json(fields: Dict, interactions) -> Response:
+    """A JSON object of `fields` plus an "interactions" array (added last)."""
+    head = app.json.dumps(fields).encode('utf-8')
+    separator = b',' if fields else b''
+    return _json_response(head[:-1] + separator + b'"interactions":'
+                          + _interaction_array(interactions) + b'}')
+
+
+def _versioned_json(world: WorldState, build) -> Response:
+    """
+    Respond with build()'s JSON, tagged with the world's version.
+    
+    A matching If-None-Match gets an empty 304, and the serialized body is
+    reused until the world changes, so idle polling builds nothing.
+    """
+    etag = f"{world.world_id}-{world.seq}"
+    # The gzipped body is a different representation, so it gets its own tag
+    gzip_etag = f"{etag}-gz"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+    elif request.if_none_match.contains(gzip_etag):
+        response = Response(status=304)
+        response.set_etag(gzip_etag)
+    else:
+        cached = _response_cache.get(request.endpoint)
+        if cached is None or cached[0] != etag:
+            cached = [etag, app.json.dumps(build()).encode('utf-8'), None]
+            _response_cache[request.endpoint] = cached
+        response = _json_response(cached[1], cached)
+        gzipped = response.headers.get('Content-Encoding') == 'gzip'
+        response.set_etag(gzip_etag if gzipped else etag)
+    response.vary.add('Accept-Encoding')
+    # Browsers revalidate on every poll instead of trusting a stale copy
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
 @app.route('/api/characters', methods=['GET'])
 def get_characters():
     """Get list of all characters."""
     if world_state is None:
         initialize_world()
-    
+    return _versioned_json(world_state, _characters_payload)
+
+
+def _characters_payload():
     characters = []
     for char in world_state.characters.values():
         characters.append({
@@ -75,8 +183,7 @@ def get_characters():
                 'name': char.animal_companion.name
             }
         })
-    
-    return jsonify(characters)
+    return characters
 
 
 @app.route('/api/locations', methods=['GET'])
@@ -84,7 +191,10 @@ def get_locations():
     """Get list of all locations."""
     if world_state is None:
         initialize_world()
-    
+    return _versioned_json(world_state, _locations_payload)
+
+
+def _locations_payload():
     locations = []
     for loc in world_state.locations.values():
         locations.append({
@@ -95,8 +205,7 @@ def get_locations():
             'current_time': loc.current_time.value,
             'current_weather': loc.current_weather.value
         })
-    
-    return jsonify(locations)
+    return locations
 
 
 @app.route('/api/scenario/seed', methods=['POST'])
@@ -118,7 +227,10 @@ def seed_scenario():
         time_compression=config_data.get('time_compression', 60),
         interaction_density=config_data.get('interaction_density', 'moderate'),
         narrative_coherence=config_data.get('narrative_coherence', 'loose'),
-        randomness=config_data.get('randomness', 0.25)
+        randomness=config_data.get('randomness', 0.25),
+        llm_paintability_threshold=config_data.get('llm_paintability_threshold', 4.0),
+        llm_call_budget=config_data.get('llm_call_budget'),
+        memory_consolidation_interval=config_data.get('memory_consolidation_interval', 20)
     )
 
     # Get API key for LLM if needed
@@ -146,39 +258,145 @@ def run_simulation():
     
     data = request.json
     duration = data.get('duration_minutes', 60)
+    wall_clock_seconds = data.get('wall_clock_seconds')
+    continuation_token = data.get('continuation_token')
     
     # Run simulation
     interactions = []
     
-    def callback(interaction: Interaction):
-        interactions.append(interaction.to_dict())
+    try:
+        result = _start_run(current_simulation, duration, wall_clock_seconds,
+                            continuation_token, callback=interactions.append)
+    except KeyError:
+        return jsonify({'status': 'error', 'message': 'Unknown or expired continuation_token'}), 400
     
-    current_simulation.run_simulation(duration, callback=callback)
-    
-    return jsonify({
+    return _interactions_json({
         'status': 'success',
-        'interactions_count': len(interactions),
-        'interactions': interactions
-    })
+        **result.to_dict(),
+        'interactions_count': len(interactions)
+    }, interactions)
+
+
+def _start_run(simulation: Simulation, duration, wall_clock_seconds, continuation_token,
+               callback=None, partial_callback=None):
+    """Start a fresh run, or resume one that stopped at its deadline."""
+    if continuation_token:
+        return simulation.continue_run(continuation_token, callback=callback,
+                                       partial_callback=partial_callback,
+                                       wall_clock_budget=wall_clock_seconds)
+    return simulation.run_simulation(duration, callback=callback,
+                                     partial_callback=partial_callback,
+                                     wall_clock_budget=wall_clock_seconds)
+
+
+@app.route('/api/simulation/run/stream', methods=['POST'])
+def run_simulation_stream():
+    """
+    Run the simulation, streaming progress as newline-delimited JSON.
+
+    Emits {"type": "partial", ...} events while LLM text arrives, one
+    {"type": "interaction", "interaction": {...}} per committed interaction,
+    and a final {"type": "done", "interactions_count": N, ...} carrying the
+    run result (completed, continuation_token, ...).
+    """
+    global current_simulation
+    
+    if current_simulation is None:
+        return jsonify({'status': 'error', 'message': 'No simulation initialized'}), 400
+    
+    data = request.json or {}
+    duration = data.get('duration_minutes', 60)
+    wall_clock_seconds = data.get('wall_clock_seconds')
+    continuation_token = data.get('continuation_token')
+    simulation = current_simulation
+    if continuation_token and not simulation.has_continuation(continuation_token):
+        return jsonify({'status': 'error', 'message': 'Unknown or expired continuation_token'}), 400
+    events = queue.Queue()
+    outcome = {}
+    
+    def on_partial(event: Dict):
+        events.put({'type': 'partial', **event})
+    
+    def on_interaction(interaction: Interaction):
+        events.put({'type': 'interaction', 'interaction': interaction})
+    
+    def worker():
+        try:
+            result = _start_run(simulation, duration, wall_clock_seconds, continuation_token,
+                                callback=on_interaction, partial_callback=on_partial)
+            outcome.update(result.to_dict())
+        except Exception as e:
+            events.put({'type': 'error', 'message': str(e)})
+        finally:
+            events.put(None)
+    
+    threading.Thread(target=worker, daemon=True).start()
+    
+    def generate():
+        count = 0
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            if event['type'] == 'interaction':
+                count += 1
+                yield b'{"type":"interaction","interaction":' + event['interaction'].to_json() + b'}\n'
+                continue
+            yield json.dumps(event) + "\n"
+        yield json.dumps({'type': 'done', **outcome, 'interactions_count': count}) + "\n"
+    
+    return Response(generate(), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def _since_seq(world: WorldState):
+    """
+    Sequence number from the `since` cursor, or None when it is missing or
+    belongs to an earlier world (the caller then sends everything).
+    """
+    world_id, _, seq = request.args.get('since', '').partition(':')
+    if world_id != world.world_id or not seq.isdigit():
+        return None
+    return int(seq)
+
+
+def _cursor(world: WorldState, seq: int) -> str:
+    return f"{world.world_id}:{seq}"
 
 
 @app.route('/api/simulation/status', methods=['GET'])
 def get_simulation_status():
-    """Get current simulation status."""
+    """
+    Get current simulation status.
+    
+    Pass the returned `cursor` back as `since` to receive only the
+    characters whose location or emotional state changed since then.
+    """
     if current_simulation is None:
         return jsonify({'status': 'no_simulation'})
 
+    world = current_simulation.world
+    cursor = world.seq
+    since = _since_seq(world)
+    if since is None:
+        characters = world.characters.values()
+    else:
+        characters = world.characters_changed_since(since)
+
     return jsonify({
         'status': 'active' if current_simulation.is_running else 'paused',
-        'current_time': current_simulation.world.current_time.isoformat(),
-        'interactions_count': len(current_simulation.world.interactions_log),
+        'current_time': world.current_time.isoformat(),
+        'interactions_count': len(world.interactions_log),
+        'generation_counts': current_simulation.generation_counts,
+        'cursor': _cursor(world, cursor),
+        'full': since is None,
         'characters': {
             char.id: {
                 'location': char.current_location,
                 'emotional_state': char.emotional_state.value,
                 'intensity': char.emotional_intensity
             }
-            for char in current_simulation.world.characters.values()
+            for char in characters
         }
     })
 
@@ -192,7 +410,95 @@ def get_recent_interactions():
     count = request.args.get('count', 10, type=int)
     interactions = current_simulation.world.get_recent_interactions(count)
 
-    return jsonify([interaction.to_dict() for interaction in interactions])
+    return _json_response(_interaction_array(interactions))
+
+
+@app.route('/api/interactions/since', methods=['GET'])
+def get_interactions_since():
+    """
+    Interactions logged after a cursor, oldest first.
+    
+    Without a valid `since` cursor, the latest `limit` interactions are
+    sent (`full` is true). Poll again with the returned `cursor`; `more`
+    means the page was cut at `limit`.
+    """
+    if world_state is None:
+        initialize_world()
+    world = current_simulation.world if current_simulation else world_state
+
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+    latest = world.seq
+    since = _since_seq(world)
+    if since is None:
+        interactions, more = world.get_recent_interactions(limit), False
+    else:
+        interactions, more = world.interactions_since(since, limit)
+    if interactions:
+        latest = interactions[-1].seq if more else max(latest, interactions[-1].seq)
+
+    return _interactions_json({
+        'cursor': _cursor(world, latest),
+        'full': since is None,
+        'more': more
+    }, interactions)
+
+
+@app.route('/api/interactions/query', methods=['GET'])
+def query_interactions():
+    """
+    Filtered, paginated interactions from the interaction store, newest first.
+    
+    Query params: location, character (repeatable; all must be present),
+    temperature, since/until (ISO simulated time), unexpected (true/false),
+    world (a world id, or "all"; default: the current world), cursor, limit.
+    """
+    if world_state is None:
+        initialize_world()
+    store = world_state.interaction_store
+    if store is None:
+        return jsonify({'error': 'Interaction store is disabled (storage.interactions_db)'}), 400
+
+    world = request.args.get('world', world_state.world_id)
+    unexpected = request.args.get('unexpected')
+    interactions, next_cursor = store.query(
+        world_id=None if world == 'all' else world,
+        location_id=request.args.get('location'),
+        characters=request.args.getlist('character'),
+        temperature=request.args.get('temperature'),
+        since=request.args.get('since'),
+        until=request.args.get('until'),
+        unexpected=None if unexpected is None else unexpected.lower() == 'true',
+        cursor=request.args.get('cursor', type=int),
+        limit=max(1, min(request.args.get('limit', 50, type=int), 500))
+    )
+    return jsonify({'interactions': interactions, 'next_cursor': next_cursor})
+
+
+@app.route('/api/interactions/search', methods=['GET'])
+def search_interactions():
+    """
+    Full-text search over field notes, best match first.
+    
+    Query params: q (words, or "quoted phrases"), world (a world id, or
+    "all"; default: the current world), limit, offset.
+    """
+    if world_state is None:
+        initialize_world()
+    store = world_state.interaction_store
+    if store is None:
+        return jsonify({'error': 'Interaction store is disabled (storage.interactions_db)'}), 400
+
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+    world = request.args.get('world', world_state.world_id)
+    results = store.search(
+        query,
+        world_id=None if world == 'all' else world,
+        limit=max(1, min(request.args.get('limit', 20, type=int), 200)),
+        offset=max(0, request.args.get('offset', 0, type=int))
+    )
+    return jsonify({'query': query, 'results': results})
 
 
 @app.route('/api/emergence/report', methods=['GET'])
@@ -232,9 +538,13 @@ def save_session():
 
 @app.route('/api/reset', methods=['POST'])
 def reset_simulation():
-    """Reset the simulation."""
+    """Reset the simulation (send {"clear_memories": true} to also wipe saved memories)."""
     global current_simulation, world_state
 
+    if (request.get_json(silent=True) or {}).get('clear_memories') and world_state:
+        for char in world_state.characters.values():
+            if char.memory_journal is not None:
+                char.memory_journal.delete()
     initialize_world()
     current_simulation = None
 
@@ -244,6 +554,16 @@ def reset_simulation():
     })
 
 
+@app.route('/api/world/reload', methods=['POST'])
+def reload_world_definitions():
+    """Merge edited character/location files into the running world now."""
+    if world_state is None:
+        initialize_world()
+    
+    changes = world_watcher.check()
+    return jsonify({'status': 'success', **changes})
+
+
 @app.route('/api/quality/analyze', methods=['GET'])
 def analyze_quality():
     """Analyze session quality and detect repetition."""
@@ -268,7 +588,38 @@ def get_map_view():
     if active_world is None:
         return jsonify({'status': 'error', 'message': 'No world initialized'}), 400
 
-    # Build map data
+    return _versioned_json(active_world, lambda: _map_payload(active_world))
+
+
+@app.route('/api/map/stream', methods=['GET'])
+def stream_map():
+    """
+    Server-Sent Events: a `snapshot` of the map view, then `delta` events
+    with the characters whose location or emotional state changed (see
+    src/api/map_stream.py). Streams end after a few minutes; EventSource
+    reconnects on its own and starts again from a snapshot.
+    """
+    if world_state is None:
+        initialize_world()
+    subscriber = map_broadcaster.subscribe()
+    
+    def generate():
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        try:
+            yield "retry: 1000\n\n"
+            while time.monotonic() < deadline:
+                try:
+                    yield subscriber.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            map_broadcaster.unsubscribe(subscriber)
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def _map_payload(active_world: WorldState) -> Dict:
     locations_data = []
     for loc in active_world.locations.values():
         chars_here = active_world.get_characters_at_location(loc.id)
@@ -286,10 +637,10 @@ def get_map_view():
             'weather': loc.current_weather.value
         })
 
-    return jsonify({
+    return {
         'status': 'success',
         'locations': locations_data
-    })
+    }
 
 
 def _convert_to_visual_description(action_text: str, characters_present: list) -> str:
@@ -345,7 +696,10 @@ def export_for_lora():
 
     # Create extractor
     api_key = os.environ.get('OPENAI_API_KEY') if use_llm else None
-    extractor = PromptExtractor(use_llm=use_llm, api_key=api_key)
+    # Bulk export is background work: it must not slow down live ticks
+    extractor = PromptExtractor(use_llm=use_llm, api_key=api_key,
+                                priority=Priority.BACKGROUND,
+                                session_id=current_simulation.session_id)
 
     # Extract paintable moments
     prompts = extractor.extract_paintable_moments(
@@ -435,7 +789,9 @@ def extract_paintable_moments():
 
     # Create extractor
     api_key = os.environ.get('OPENAI_API_KEY') if use_llm else None
-    extractor = PromptExtractor(use_llm=use_llm, api_key=api_key)
+    extractor = PromptExtractor(use_llm=use_llm, api_key=api_key,
+                                priority=Priority.EXTRACTION,
+                                session_id=current_simulation.session_id)
 
     # Extract paintable moments
     prompts = extractor.extract_paintable_moments(
@@ -476,10 +832,17 @@ def get_llm_status():
         'llm_enabled': LLM_STATUS.get('llm_enabled'),
         'has_api_key_in_generator': LLM_STATUS.get('has_api_key'),
         'model': LLM_STATUS.get('model'),
+        'provider': LLM_STATUS.get('provider'),
         'last_error': LLM_STATUS.get('last_error'),
         'simulation_uses_llm': bool(current_simulation and getattr(current_simulation, 'use_llm', False))
     }
 
+    provider = current_simulation.description_generator.provider if current_simulation else None
+    provider = getattr(provider, 'inner', provider)
+    if provider is not None and hasattr(provider, 'get_stats'):
+        status['routing'] = provider.get_stats()
+    status['gateway'] = get_gateway().get_stats()
+
     if has_env_key:
         key = os.environ.get('OPENAI_API_KEY', '')
         if key:
@@ -0,0 +1,172 @@
+"""
+Push channel for the map views.
+
+Instead of polling /api/map/view, map clients hold one Server-Sent Events
+stream (GET /api/map/stream). The MapBroadcaster listens to the world's
+character changes (WorldState.record_character_changes), coalesces them per
+frame -- a character that moves twice within a frame is sent once, in its
+latest state -- and pushes the same compact delta to every connected client:
+
+    event: delta
+    data: {"version": "<world>-<seq>", "characters": [{"id", "name",
+           "emotional_state", "animal", "location_id"}, ...],
+           "locations": [{"id", "time_of_day", "weather"}, ...]}
+
+("locations" only when the time of day or weather moved on.) A client
+starts from a full `snapshot` event (the /api/map/view payload) and gets
+another one whenever something a delta can't express changed (a location
+added by hot reload, a reset to a new world), or when it fell too far
+behind to catch up.
+"""
+import json
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+def format_event(event: str, data: Dict) -> str:
+    """One SSE message."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def location_conditions(location) -> Dict:
+    return {
+        'id': location.id,
+        'time_of_day': location.current_time.value,
+        'weather': location.current_weather.value,
+    }
+
+
+def character_delta(char) -> Dict:
+    return {
+        'id': char.id,
+        'name': char.name,
+        'emotional_state': char.emotional_state.value,
+        'animal': char.animal_companion.name,
+        'location_id': char.current_location,
+    }
+
+
+class MapBroadcaster:
+    """Fans coalesced world changes out to every map stream."""
+
+    def __init__(self, snapshot: Callable, frame_seconds: float = 0.1, backlog: int = 64):
+        """
+        Args:
+            snapshot: world -> full map payload (sent on connect and resync)
+            frame_seconds: How long changes are gathered before one push
+            backlog: Undelivered frames a slow client may hold before it is
+                sent a fresh snapshot instead
+        """
+        self.snapshot = snapshot
+        self.frame_seconds = frame_seconds
+        self.backlog = backlog
+        self._world = None
+        self._pending: Dict[str, Dict] = {}  # character id -> latest delta
+        self._conditions_changed = False
+        self._resync = False
+        self._location_ids = ()  # Locations the last broadcast snapshot listed (_run only)
+        self._subscribers: List[queue.Queue] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, world):
+        """Follow this world (replacing any earlier one); clients are resynced."""
+        world.add_change_listener(self._on_change)
+        with self._cond:
+            self._world = world
+            self._pending.clear()
+            self._resync = True
+            self._cond.notify()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _on_change(self, world, characters: List):
+        """World listener: changed characters, or [] for any other change."""
+        with self._cond:
+            if world is not self._world:
+                return  # A world replaced by a reset
+            if characters:
+                for char in characters:
+                    self._pending[char.id] = character_delta(char)
+            else:
+                self._conditions_changed = True
+            self._cond.notify()
+
+    def subscribe(self) -> queue.Queue:
+        """A queue of SSE messages, starting with a snapshot."""
+        subscriber = queue.Queue(maxsize=self.backlog)
+        with self._cond:
+            world = self._world
+            self._subscribers.append(subscriber)
+        if world is not None:
+            subscriber.put_nowait(self._snapshot_event(world))
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._cond:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _snapshot_event(self, world) -> str:
+        payload = self.snapshot(world)
+        payload['version'] = f"{world.world_id}-{world.seq}"
+        return format_event('snapshot', payload)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not (self._pending or self._conditions_changed or self._resync):
+                    self._cond.wait()
+            # Let the rest of this frame's changes arrive
+            time.sleep(self.frame_seconds)
+            with self._cond:
+                world = self._world
+                pending, self._pending = self._pending, {}
+                conditions, self._conditions_changed = self._conditions_changed, False
+                resync, self._resync = self._resync, False
+                # Read before the subscriber list: anyone subscribing after
+                # this gets a snapshot at least this new
+                location_ids = tuple(world.locations)
+                subscribers = list(self._subscribers)
+            if not subscribers:
+                # Nobody to resync; new subscribers start from their own snapshot
+                self._location_ids = location_ids
+                continue
+            try:
+                if resync or location_ids != self._location_ids:
+                    self._location_ids = location_ids
+                    message = self._snapshot_event(world)
+                else:
+                    delta = {
+                        'version': f"{world.world_id}-{world.seq}",
+                        'characters': list(pending.values()),
+                    }
+                    if conditions:
+                        delta['locations'] = [location_conditions(location)
+                                              for location in world.locations.values()]
+                    message = format_event('delta', delta)
+            except Exception as e:
+                print(f"Map stream frame skipped: {e}")
+                continue
+            for subscriber in subscribers:
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    # Too far behind for deltas: drop its backlog, send the whole map
+                    self._drain(subscriber)
+                    subscriber.put_nowait(self._snapshot_event(world))
+
+    @staticmethod
+    def _drain(subscriber: queue.Queue):
+        while True:
+            try:
+                subscriber.get_nowait()
+            except queue.Empty:
+                return
@@ -2,6 +2,7 @@
 Character decision-making engine with autonomous behavior.
 """
 import random
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 from enum import Enum
 
@@ -9,6 +10,10 @@ from src.models.character import Character, EmotionalState
 from src.models.location import Location
 
 
+# A remembered meeting younger than this (simulated time) happened "recently"
+RECENT_MEETING = timedelta(hours=6)
+
+
 class ActionType(Enum):
     """Possible action types characters can take."""
     MOVE_TO_LOCATION = "move_to_location"
@@ -44,7 +49,8 @@ class DecisionEngine:
     
     def decide_action(self, character: Character, current_location: Location,
                      available_locations: Dict[str, Location],
-                     other_characters_present: List[Character]) -> Decision:
+                     other_characters_present: List[Character],
+                     now: Optional[datetime] = None) -> Decision:
         """
         Decide what action a character should take.
         
@@ -53,6 +59,7 @@ class DecisionEngine:
         - Current emotional state
         - Environmental context
         - Presence of other characters
+        - Memories of them, ranked as of `now` (the world's simulated time)
         - Randomness
         """
         # If other characters present, strongly prefer interaction (70% of time)
@@ -61,11 +68,11 @@ class DecisionEngine:
             
             # Check if they've met before - informs interaction
             has_history = character.has_met_before(target.id)
-            past_meetings = character.get_memories_about(target.id, limit=2)
+            past_meetings = self._recall_meetings(character, target, now) if has_history else []
             
             # Build specific interaction context based on character + history
             context = self._build_interaction_context(
-                character, target, has_history, past_meetings
+                character, target, has_history, past_meetings, now
             )
             
             return Decision(
@@ -89,8 +96,22 @@ class DecisionEngine:
         
         return decision
     
+    def _recall_meetings(self, character: Character, target: Character,
+                         now: Optional[datetime]) -> List:
+        """
+        Memories of `target` that matter most right now, best first: ranked
+        by relevance, importance and decay from `now`, falling back to the
+        latest meetings when none of the top matches involve them. Ranked
+        locally (text sketches), so a decision never waits on the network.
+        """
+        recalled = character.search_memories(target.name, limit=3, use_embeddings=True, now=now,
+                                             offline=True)
+        meetings = [m for m in recalled if target.id in m.other_characters]
+        return meetings or character.get_memories_about(target.id, limit=2)[::-1]
+    
     def _build_interaction_context(self, character: Character, target: Character,
-                                   has_history: bool, past_meetings: List) -> str:
+                                   has_history: bool, past_meetings: List,
+                                   now: Optional[datetime] = None) -> str:
         """Build specific context for character interaction based on their nature and history."""
         
         # Character-specific interaction tendencies
@@ -162,9 +183,12 @@ class DecisionEngine:
         
         # Add history context if they've met before
         if has_history and past_meetings:
-            last_meeting = past_meetings[-1]
-            time_ago = "recently" if len(character.memory_stream) < 10 else "earlier"
-            base_context += f". They met {time_ago}: {last_meeting.content[:40]}..."
+            meeting = past_meetings[0]
+            if now is not None:
+                time_ago = "recently" if now - meeting.timestamp < RECENT_MEETING else "earlier"
+            else:
+                time_ago = "recently" if len(character.memory_stream) < 10 else "earlier"
+            base_context += f". They met {time_ago}: {meeting.content[:40]}..."
         
         return base_context
     
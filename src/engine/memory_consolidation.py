@@ -0,0 +1,258 @@
+"""
+Memory consolidation.
+
+Long-running characters pile up near-identical low-importance memories
+("Parade stands motionless in the space..."). A consolidation pass finds
+clusters of similar low-importance memories (leaving the newest few alone)
+and replaces each cluster with one summary memory whose importance grows
+with the size of the cluster. Originals go to the character's cold archive.
+
+Summaries come from a template by default, or from the LLM (BACKGROUND
+priority) when enabled, falling back to the template on any failure. LLM
+summaries are written by BackgroundConsolidation on a worker thread, so a
+pass never holds up simulation ticks; the merges themselves still happen on
+the simulation's thread, between ticks.
+"""
+import math
+import queue
+import threading
+from collections import Counter
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.models.character import Character, Memory
+from src.llm.providers import LLMProvider, create_provider
+from src.llm.gateway import Priority, gate
+
+
+class TemplateMemorySummarizer:
+    """Summarizes a cluster without an LLM."""
+
+    def summarize(self, character: Character, memories: List[Memory]) -> str:
+        first, last = memories[0].timestamp, memories[-1].timestamp
+        # The most frequent wording stands in for the whole cluster
+        representative = Counter(m.content for m in memories).most_common(1)[0][0]
+        if len(representative) > 120:
+            representative = representative[:117] + "..."
+        return (f"{len(memories)} similar moments between {first.strftime('%H:%M')} "
+                f"and {last.strftime('%H:%M')}: {representative}")
+
+
+class LLMMemorySummarizer:
+    """Summarizes a cluster with the LLM, falling back to the template."""
+
+    def __init__(self, provider: Optional[LLMProvider] = None, session_id: str = "default",
+                 timeout: float = 20.0):
+        """
+        Args:
+            provider: LLM backend (default: llm.provider in config)
+            session_id: Session whose background LLM share this uses
+            timeout: Seconds one summary may take, queueing included,
+                before the template is used instead
+        """
+        self.fallback = TemplateMemorySummarizer()
+        self.timeout = timeout
+        self.provider = provider
+        if self.provider is None:
+            try:
+                self.provider = create_provider()
+            except ValueError as e:
+                print(f"LLM provider unavailable: {e}. Using template summaries.")
+        # Summaries are housekeeping; they never hold up interactive ticks
+        self.provider = gate(self.provider, Priority.BACKGROUND, session_id)
+
+    def summarize(self, character: Character, memories: List[Memory]) -> str:
+        if self.provider is None or not self.provider.is_available:
+            return self.fallback.summarize(character, memories)
+
+        lines = "\n".join(f"- [{m.timestamp.strftime('%H:%M')}] {m.content}" for m in memories)
+        messages = [
+            {"role": "system", "content": "You compress a character's repetitive memories into "
+                                          "one plain, concrete sentence. No interpretation."},
+            {"role": "user", "content": f"Memories of {character.name}:\n{lines}\n\n"
+                                        "One sentence summarizing what kept happening:"}
+        ]
+        try:
+            summary = self.provider.chat(messages, temperature=0.3, max_tokens=80,
+                                         timeout=self.timeout).strip()
+        except Exception as e:
+            print(f"LLM summary failed: {e}. Using template.")
+            return self.fallback.summarize(character, memories)
+        return summary or self.fallback.summarize(character, memories)
+
+
+class MemoryConsolidator:
+    """Merges clusters of similar low-importance memories."""
+
+    def __init__(self, summarizer=None, importance_below: float = 7.0,
+                 similarity: float = 0.6, min_cluster: int = 3, keep_recent: int = 5):
+        """
+        Args:
+            summarizer: Object with summarize(character, memories) -> str
+            importance_below: Only memories below this importance are merged
+            similarity: Minimum sketch cosine similarity to join a cluster
+            min_cluster: Smallest cluster worth replacing with a summary
+            keep_recent: Newest memories that are never merged
+        """
+        self.summarizer = summarizer or TemplateMemorySummarizer()
+        self.importance_below = importance_below
+        self.similarity = similarity
+        self.min_cluster = min_cluster
+        self.keep_recent = keep_recent
+
+    def consolidate(self, character: Character) -> int:
+        """
+        Run one pass over a character's in-memory tiers.
+
+        Returns:
+            Number of summary memories created
+        """
+        created = 0
+        for cluster in self.find_clusters(character):
+            # An earlier replacement may have pushed members out of memory
+            cluster = [m for m in cluster if m in character.memory_stream]
+            if len(cluster) < self.min_cluster:
+                continue
+            self.merge(character, cluster, self.summarizer.summarize(character, cluster))
+            created += 1
+        return created
+
+    def find_clusters(self, character: Character) -> List[List[Memory]]:
+        """Clusters worth merging, each oldest first (nothing is changed yet)."""
+        older = character.memory_stream[:-self.keep_recent] if self.keep_recent else character.memory_stream
+        candidates = [m for m in older
+                      if m.importance < self.importance_below and m.memory_type != "summary"]
+        if len(candidates) < self.min_cluster:
+            return []
+        return [sorted(cluster, key=lambda m: m.timestamp)
+                for cluster in self._clusters(character, candidates)]
+
+    def merge(self, character: Character, cluster: List[Memory], content: str) -> bool:
+        """
+        Replace a cluster with one summary memory reading `content`.
+
+        Returns:
+            False (and nothing is changed) if a member has left memory since
+            the cluster was found
+        """
+        if not all(m in character.memory_stream for m in cluster):
+            return False
+        summary = Memory(
+            timestamp=cluster[-1].timestamp,
+            memory_type="summary",
+            content=content,
+            location=Counter(m.location for m in cluster).most_common(1)[0][0],
+            other_characters=sorted({c for m in cluster for c in m.other_characters}),
+            importance=self._aggregate_importance(cluster),
+            emotional_impact=sum(m.emotional_impact for m in cluster) / len(cluster)
+        )
+        character.replace_memories(cluster, summary)
+        return True
+
+    def _clusters(self, character: Character, candidates: List[Memory]) -> List[List[Memory]]:
+        """Greedy single-pass clustering on the character's text sketches."""
+        vectors = character.memory_sketches.vectors(candidates)
+        norms = np.linalg.norm(vectors, axis=1)
+        norms[norms == 0] = 1.0
+        unit = vectors / norms[:, None]
+        similar = (unit @ unit.T) >= self.similarity
+
+        clusters = []
+        assigned = np.zeros(len(candidates), dtype=bool)
+        for i in range(len(candidates)):
+            if assigned[i]:
+                continue
+            members = np.flatnonzero(similar[i] & ~assigned)
+            if len(members) >= self.min_cluster:
+                assigned[members] = True
+                clusters.append([candidates[j] for j in members])
+        return clusters
+
+    @staticmethod
+    def _aggregate_importance(cluster: List[Memory]) -> float:
+        """Strongest member, plus a bonus that grows with repetition."""
+        peak = max(m.importance for m in cluster)
+        return round(min(10.0, peak + 0.5 * math.log2(len(cluster))), 2)
+
+
+class BackgroundConsolidation:
+    """
+    Writes a consolidator's summaries on a worker thread.
+
+    schedule() finds clusters and queues them; the worker summarizes them
+    (slow LLM calls); merge_finished() applies whatever is done. Both of
+    those are called from the simulation's thread, so memories are only
+    ever changed there.
+    """
+
+    def __init__(self, consolidator: MemoryConsolidator, idle_seconds: float = 5.0):
+        """
+        Args:
+            consolidator: Finds clusters, summarizes and merges them
+            idle_seconds: How long the worker waits for more work before exiting
+        """
+        self.consolidator = consolidator
+        self.idle_seconds = idle_seconds
+        self._jobs: "queue.Queue[Tuple[Character, List[List[Memory]]]]" = queue.Queue()
+        self._finished: "queue.Queue[Tuple[Character, List[Tuple[List[Memory], str]]]]" = queue.Queue()
+        self._queued = set()  # ids of characters with clusters in flight
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        """Characters whose summaries are still being written."""
+        return len(self._queued)
+
+    def schedule(self, characters) -> int:
+        """Queue each character's clusters (skipping characters already queued)."""
+        queued = 0
+        for character in characters:
+            if character.id in self._queued:
+                continue
+            clusters = self.consolidator.find_clusters(character)
+            if not clusters:
+                continue
+            self._queued.add(character.id)
+            self._jobs.put((character, clusters))
+            queued += len(clusters)
+        if queued:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+        return queued
+
+    def merge_finished(self) -> int:
+        """Merge every cluster whose summary is ready; returns summaries created."""
+        created = 0
+        while True:
+            try:
+                character, summaries = self._finished.get_nowait()
+            except queue.Empty:
+                return created
+            self._queued.discard(character.id)
+            for cluster, content in summaries:
+                if self.consolidator.merge(character, cluster, content):
+                    created += 1
+
+    def _run(self):
+        summarizer = self.consolidator.summarizer
+        while True:
+            try:
+                character, clusters = self._jobs.get(timeout=self.idle_seconds)
+            except queue.Empty:
+                with self._lock:
+                    # schedule() starts a new worker once this one is gone
+                    if self._jobs.empty():
+                        self._thread = None
+                        return
+                continue
+            summaries = []
+            for cluster in clusters:
+                try:
+                    summaries.append((cluster, summarizer.summarize(character, cluster)))
+                except Exception as e:
+                    print(f"Memory summary skipped for {character.name}: {e}")
+            self._finished.put((character, summaries))
@@ -1,8 +1,83 @@
 """
 Extracts paintable moments and generates prompts for artists and image generation.
 """
-from typing import List, Dict, Tuple
-from src.models.interaction import Interaction, EmotionalTemperature
+from typing import List, Dict, Tuple, Optional
+from src.models.character import Character, EmotionalState
+from src.models.interaction import Interaction, InteractionType, EmotionalTemperature
+from src.llm.providers import LLMProvider, create_provider
+from src.llm.gateway import Priority, gate
+
+
+# Paintability points for a moment's emotional charge (max 3)
+CHARGE_SCORES = {
+    EmotionalTemperature.CHARGED: 3.0,
+    EmotionalTemperature.TENSE: 2.5,
+    EmotionalTemperature.RUPTURED: 3.0,
+    EmotionalTemperature.RITUAL: 2.0,
+    EmotionalTemperature.AGGRESSIVE: 2.0,
+    EmotionalTemperature.TENDER: 1.5,
+    EmotionalTemperature.EXUBERANT: 2.0,
+    EmotionalTemperature.MELANCHOLIC: 1.5,
+    EmotionalTemperature.UNCERTAIN: 1.0
+}
+
+# Before a scene is written we only know how the characters feel, so their
+# states stand in for the emotional temperature the scene will likely have.
+STATE_CHARGE_SCORES = {
+    EmotionalState.CHARGED: 3.0,
+    EmotionalState.TENSE: 2.5,
+    EmotionalState.AGGRESSIVE: 2.0,
+    EmotionalState.EXUBERANT: 2.0,
+    EmotionalState.MELANCHOLIC: 1.5,
+    EmotionalState.RESTLESS: 1.5,
+    EmotionalState.UNCERTAIN: 1.0,
+    EmotionalState.WITHDRAWN: 1.0,
+    EmotionalState.CALM: 0.5
+}
+
+INTERACTION_TYPE_SCORES = {
+    InteractionType.CHARACTER_TO_CHARACTER: 1.0,
+    InteractionType.CHARACTER_TO_ANIMAL: 0.5,
+    InteractionType.ANIMAL_TO_ANIMAL: 0.5,
+    InteractionType.CHARACTER_TO_ENVIRONMENT: 0.3,
+    InteractionType.ANIMAL_TO_ENVIRONMENT: 0.3,
+    InteractionType.OBSERVATION: 0.0
+}
+
+
+def estimate_paintability(
+    interaction_type: InteractionType,
+    characters: List[Character],
+    animals_present: List[str],
+    is_unexpected: bool = False
+) -> float:
+    """
+    Estimate how paintable a scene will be before it is generated (0-10).
+
+    Mirrors PromptExtractor._score_paintability, using the people present
+    and their emotional states/intensity in place of the not-yet-written
+    description. Used to decide which scenes are worth an LLM call.
+    """
+    if not characters:
+        return 0.0
+    
+    # Emotional charge (max 3 points), scaled by the most intense character
+    charge = max(STATE_CHARGE_SCORES.get(c.emotional_state, 1.0) * (0.5 + c.emotional_intensity)
+                 for c in characters)
+    score = min(charge, 3.0)
+    
+    # Multiple characters (max 2 points) and their animals (max 1 point)
+    score += min(len(characters) * 0.5, 2.0)
+    score += min(len(animals_present) * 0.3, 1.0)
+    
+    # What kind of scene it is (max 1 point)
+    score += INTERACTION_TYPE_SCORES.get(interaction_type, 0.0)
+    
+    # Emergent behavior (bonus 2 points)
+    if is_unexpected:
+        score += 2.0
+    
+    return score
 
 
 class PaintablePrompt:
@@ -52,14 +127,34 @@ class PaintablePrompt:
 class PromptExtractor:
     """Extracts paintable moments from simulation and generates prompts."""
     
-    def __init__(self, use_llm: bool = False, api_key: str = None):
+    def __init__(self, use_llm: bool = False, api_key: str = None,
+                 provider: Optional[LLMProvider] = None,
+                 priority: Priority = Priority.EXTRACTION, session_id: str = "default"):
         """
         Args:
             use_llm: Use LLM to generate prompts (better quality)
             api_key: OpenAI API key for LLM mode
+            provider: Explicit LLM backend. Defaults to llm.provider in config.
+            priority: Gateway priority class (EXTRACTION for UI requests,
+                BACKGROUND for bulk exports)
+            session_id: Session whose LLM share these calls use
         """
         self.use_llm = use_llm
         self.api_key = api_key
+        self.provider = provider
+        
+        if use_llm and self.provider is None:
+            try:
+                self.provider = create_provider(api_key=api_key)
+            except ValueError as e:
+                print(f"LLM provider unavailable: {e}. Using templates.")
+                self.use_llm = False
+        
+        self.provider = gate(self.provider, priority, session_id)
+        
+        if self.use_llm and not self.provider.is_available:
+            print(f"LLM provider unavailable: {self.provider.unavailable_reason}. Using templates.")
+            self.use_llm = False
     
     def extract_paintable_moments(
         self,
@@ -100,18 +195,7 @@ class PromptExtractor:
         score = 0.0
         
         # Emotional charge (max 3 points)
-        charge_scores = {
-            EmotionalTemperature.CHARGED: 3.0,
-            EmotionalTemperature.TENSE: 2.5,
-            EmotionalTemperature.RUPTURED: 3.0,
-            EmotionalTemperature.RITUAL: 2.0,
-            EmotionalTemperature.AGGRESSIVE: 2.0,
-            EmotionalTemperature.TENDER: 1.5,
-            EmotionalTemperature.EXUBERANT: 2.0,
-            EmotionalTemperature.MELANCHOLIC: 1.5,
-            EmotionalTemperature.UNCERTAIN: 1.0
-        }
-        score += charge_scores.get(interaction.emotional_temperature, 0)
+        score += CHARGE_SCORES.get(interaction.emotional_temperature, 0)
         
         # Multiple characters (max 2 points)
         score += min(len(interaction.characters_present) * 0.5, 2.0)
@@ -207,9 +291,6 @@ class PromptExtractor:
         """Generate prompts using LLM (higher quality, costs $)."""
         
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=self.api_key)
-            
             analysis_prompt = f"""Analyze this field note and extract painting/image generation prompts for CALEB (the painter):
 
 FIELD NOTE:
@@ -255,9 +336,8 @@ Format as JSON:
 }}
 """
             
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
+            result = self.provider.chat(
+                [
                     {"role": "system", "content": "You are an art director helping CALEB (the painter) identify strong moments. Use technical photography/lighting terms, not style references. Describe vantage point, contrast, light quality, texture."},
                     {"role": "user", "content": analysis_prompt}
                 ],
@@ -266,7 +346,6 @@ Format as JSON:
             )
             
             import json
-            result = response.choices[0].message.content
             
             # Parse JSON
             if "{" in result:
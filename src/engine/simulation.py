@@ -2,17 +2,56 @@
 Main simulation engine that orchestrates the autonomous world.
 """
 import random
+import time
+import uuid
 from typing import Dict, List, Optional
 from datetime import datetime
 
-from src.models.character import Character, EmotionalState, Memory
+from src.models.character import Character, EmotionalState, Memory, MemoryRecord
 from src.models.location import Location
 from src.models.interaction import Interaction, InteractionType, EmotionalTemperature
 from src.engine.world_state import WorldState
 from src.engine.decision_engine import DecisionEngine, ActionType, Decision
+from src.engine.prompt_extractor import estimate_paintability
+from src.engine.memory_consolidation import (
+    BackgroundConsolidation, MemoryConsolidator, LLMMemorySummarizer, TemplateMemorySummarizer
+)
 from src.generators.description_generator import DescriptionGenerator
 
 
+class RunResult:
+    """Outcome of a (possibly deadline-bounded) simulation run."""
+    
+    def __init__(
+        self,
+        completed: bool,
+        simulated_minutes: float,
+        remaining_minutes: float,
+        interactions_count: int,
+        wall_clock_seconds: float,
+        degraded_ticks: int = 0,
+        continuation_token: Optional[str] = None
+    ):
+        self.completed = completed
+        self.simulated_minutes = simulated_minutes
+        self.remaining_minutes = remaining_minutes
+        self.interactions_count = interactions_count
+        self.wall_clock_seconds = wall_clock_seconds
+        self.degraded_ticks = degraded_ticks  # ticks that fell back to templates for time
+        self.continuation_token = continuation_token  # pass to continue_run()
+    
+    def to_dict(self) -> dict:
+        return {
+            "completed": self.completed,
+            "simulated_minutes": self.simulated_minutes,
+            "remaining_minutes": self.remaining_minutes,
+            "interactions_count": self.interactions_count,
+            "wall_clock_seconds": round(self.wall_clock_seconds, 3),
+            "degraded_ticks": self.degraded_ticks,
+            "continuation_token": self.continuation_token
+        }
+
+
 class SimulationConfig:
     """Configuration for simulation parameters."""
     
@@ -22,7 +61,10 @@ class SimulationConfig:
         time_compression: int = 60,
         interaction_density: str = "moderate",
         narrative_coherence: str = "loose",
-        randomness: float = 0.25
+        randomness: float = 0.25,
+        llm_paintability_threshold: float = 4.0,
+        llm_call_budget: Optional[int] = None,
+        memory_consolidation_interval: int = 20
     ):
         self.autonomy_level = autonomy_level  # 0.0-1.0
         self.time_compression = time_compression  # real minutes to sim minutes
@@ -30,6 +72,15 @@ class SimulationConfig:
         self.narrative_coherence = narrative_coherence  # loose, tight
         self.randomness = randomness  # 0.0-1.0
         
+        # LLM gating: only scenes estimated at least this paintable (0-10)
+        # get an LLM description, up to llm_call_budget calls per run
+        # (None = unlimited). Everything else uses templates.
+        self.llm_paintability_threshold = llm_paintability_threshold
+        self.llm_call_budget = llm_call_budget
+        
+        # Merge repetitive low-importance memories every N ticks (0 = never)
+        self.memory_consolidation_interval = memory_consolidation_interval
+        
         # Convert density to time between actions
         density_map = {
             "sparse": 10,  # action every 10 sim minutes
@@ -51,15 +102,34 @@ class Simulation:
     ):
         self.world = world_state
         self.config = config
+        self.session_id = uuid.uuid4().hex[:12]
         self.decision_engine = DecisionEngine(
             autonomy_level=config.autonomy_level,
             randomness=config.randomness
         )
         self.description_generator = DescriptionGenerator(
             use_llm=use_llm,
-            api_key=llm_api_key
+            api_key=llm_api_key,
+            session_id=self.session_id
         )
         self.use_llm = self.description_generator.use_llm
+        self.memory_consolidator = MemoryConsolidator(
+            summarizer=LLMMemorySummarizer(session_id=self.session_id) if self.use_llm
+            else TemplateMemorySummarizer()
+        )
+        # LLM summaries are slow, so they are written off the tick thread
+        self.background_consolidation = (BackgroundConsolidation(self.memory_consolidator)
+                                         if self.use_llm else None)
+        self.ticks = 0
+        self.llm_calls_this_run = 0
+        self.generation_counts = {"llm": 0, "template": 0}
+        self.tick_seconds = {"llm": 0.0, "template": 0.0}  # moving averages (0 = not timed yet)
+        self._time_left: Optional[float] = None  # Seconds to the deadline when this tick began
+        # token -> (minutes left, LLM calls used); only the latest stopped run
+        # can be resumed, so abandoned tokens don't pile up
+        self._continuations: Dict[str, tuple] = {}
+        self._degraded = False
+        self._last_tick_used_llm = False
         self.is_running = False
         self.emergence_tracker = EmergenceTracker()
     
@@ -73,29 +143,87 @@ class Simulation:
         for char_id, loc_id in character_placements.items():
             if char_id in self.world.characters and loc_id in self.world.locations:
                 self.world.characters[char_id].current_location = loc_id
+        self.world.record_character_changes(self.world.characters.values())
     
-    def run_simulation(self, duration_minutes: float, callback=None):
+    def run_simulation(self, duration_minutes: float, callback=None, partial_callback=None,
+                       wall_clock_budget: Optional[float] = None) -> 'RunResult':
         """
         Run simulation for specified duration.
         
         Args:
             duration_minutes: How long to run (in simulated time)
             callback: Optional callback function called after each interaction
+            partial_callback: Optional callback receiving partial-text events
+                ({character_id, location_id, field, text}) while LLM output streams
+            wall_clock_budget: Optional real-time limit in seconds. As the
+                deadline nears, ticks switch to templates; if simulated time
+                is left when it passes, the result carries a continuation token.
+        
+        Returns:
+            RunResult describing how far the run got
+        """
+        self.llm_calls_this_run = 0
+        return self._run(duration_minutes, callback, partial_callback, wall_clock_budget)
+    
+    def continue_run(self, continuation_token: str, callback=None, partial_callback=None,
+                     wall_clock_budget: Optional[float] = None) -> 'RunResult':
+        """
+        Resume a run that stopped at its wall-clock deadline.
+        
+        Raises:
+            KeyError: if the token is unknown, was already used, or belongs
+                to an earlier run than the latest one that stopped early
         """
+        remaining, llm_calls = self._continuations.pop(continuation_token)
+        self.llm_calls_this_run = llm_calls
+        return self._run(remaining, callback, partial_callback, wall_clock_budget)
+    
+    def has_continuation(self, continuation_token: str) -> bool:
+        """Whether a token from an earlier deadline-bounded run can still be resumed."""
+        return continuation_token in self._continuations
+    
+    def _run(self, duration_minutes: float, callback, partial_callback,
+             wall_clock_budget: Optional[float]) -> 'RunResult':
+        """Tick loop shared by run_simulation and continue_run."""
         self.is_running = True
+        started = time.monotonic()
+        deadline = started + wall_clock_budget if wall_clock_budget is not None else None
         elapsed = 0
+        interactions_count = 0
+        degraded_ticks = 0
+        idle = False
         
         while elapsed < duration_minutes and self.is_running:
             # Each cycle represents a time step
             time_step = self.config.minutes_per_action
             
+            self._degraded = False
+            self._time_left = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= self.tick_seconds["template"]:
+                    break
+                # Not enough time left for a typical LLM tick: use templates.
+                # Until one has been timed, let it run; the cutoff bounds it.
+                llm_estimate = self.tick_seconds["llm"]
+                self._degraded = llm_estimate > 0 and remaining < llm_estimate * 1.5
+                # ...and an LLM tick that runs long is cut off at the deadline
+                self._time_left = remaining - self.tick_seconds["template"]
+            
             # Select active characters (those currently at locations)
             active_characters = [c for c in self.world.characters.values() 
                                if c.current_location is not None]
             
             if not active_characters:
+                # Nothing to simulate; report only the minutes that were
+                idle = True
                 break
             
+            tick_started = time.monotonic()
+            self._last_tick_used_llm = False
+            if self.background_consolidation is not None:
+                self.background_consolidation.merge_finished()
+            
             # Pick a character to act this cycle
             acting_character = random.choice(active_characters)
             
@@ -109,7 +237,8 @@ class Simulation:
                 acting_character,
                 current_location,
                 self.world.locations,
-                other_chars
+                other_chars,
+                now=self.world.current_time
             )
             
             # Execute action and generate interaction
@@ -117,28 +246,71 @@ class Simulation:
                 acting_character,
                 decision,
                 current_location,
-                other_chars
+                other_chars,
+                partial_callback=partial_callback
             )
             
             if interaction:
                 self.world.add_interaction(interaction)
                 self.emergence_tracker.track(interaction, acting_character)
+                interactions_count += 1
                 
                 if callback:
                     callback(interaction)
             
+            self.world.record_character_changes([acting_character] + other_chars)
+            
             # Advance time
             self.world.advance_time(time_step)
             elapsed += time_step
+            
+            self._record_tick_time(time.monotonic() - tick_started)
+            if self._degraded:
+                degraded_ticks += 1
+            
+            self.ticks += 1
+            interval = self.config.memory_consolidation_interval
+            # Housekeeping waits when the deadline is close
+            if interval and self.ticks % interval == 0 and not self._degraded:
+                if self.background_consolidation is not None:
+                    self.background_consolidation.schedule(self.world.characters.values())
+                else:
+                    self.consolidate_memories()
         
         self.is_running = False
+        self._degraded = False
+        self._time_left = None
+        
+        remaining_minutes = max(0.0, duration_minutes - elapsed)
+        token = None
+        if remaining_minutes > 0 and deadline is not None and not idle:
+            token = uuid.uuid4().hex
+            self._continuations.clear()
+            self._continuations[token] = (remaining_minutes, self.llm_calls_this_run)
+        
+        return RunResult(
+            completed=remaining_minutes == 0,
+            simulated_minutes=elapsed,
+            remaining_minutes=remaining_minutes,
+            interactions_count=interactions_count,
+            wall_clock_seconds=time.monotonic() - started,
+            degraded_ticks=degraded_ticks,
+            continuation_token=token
+        )
+    
+    def _record_tick_time(self, seconds: float, alpha: float = 0.3):
+        """Update the moving estimate of how long an LLM/template tick takes."""
+        kind = "llm" if self._last_tick_used_llm else "template"
+        previous = self.tick_seconds[kind]
+        self.tick_seconds[kind] = seconds if previous == 0.0 else alpha * seconds + (1 - alpha) * previous
     
     def _execute_decision(
         self,
         character: Character,
         decision: Decision,
         location: Location,
-        other_characters: List[Character]
+        other_characters: List[Character],
+        partial_callback=None
     ) -> Optional[Interaction]:
         """Execute a character's decision and create an interaction."""
         
@@ -148,6 +320,8 @@ class Simulation:
             if decision.target in self.world.locations:
                 character.current_location = decision.target
                 location = self.world.locations[decision.target]
+                # Publish the move now; describing it may take an LLM call
+                self.world.record_character_changes([character])
                 interaction_type = InteractionType.OBSERVATION
             else:
                 return None
@@ -168,6 +342,25 @@ class Simulation:
         chars_present = self.world.get_characters_at_location(character.current_location)
         animals_present = self.world.get_animals_at_location(character.current_location)
         
+        on_partial = None
+        if partial_callback is not None:
+            def _emit_partial(field_name: str, text: str):
+                partial_callback({
+                    "character_id": character.id,
+                    "location_id": location.id,
+                    "field": field_name,
+                    "text": text
+                })
+            on_partial = _emit_partial
+        
+        use_llm = self._should_use_llm(interaction_type, chars_present, animals_present, decision)
+        self._last_tick_used_llm = use_llm
+        if use_llm:
+            self.llm_calls_this_run += 1
+            self.generation_counts["llm"] += 1
+        else:
+            self.generation_counts["template"] += 1
+        
         # Generate description
         action_desc, material_details, emotional_temp, cinematic_report = self.description_generator.generate_interaction_description(
             interaction_type,
@@ -175,7 +368,10 @@ class Simulation:
             chars_present,
             decision.reasoning,
             location.current_time.value,
-            location.current_weather.value
+            location.current_weather.value,
+            on_partial=on_partial,
+            use_llm=use_llm,
+            time_limit=self._time_left
         )
 
         # Create interaction
@@ -204,6 +400,21 @@ class Simulation:
         
         return interaction
     
+    def _should_use_llm(self, interaction_type: InteractionType,
+                        characters_present: List[Character], animals_present: List[str],
+                        decision: Decision) -> bool:
+        """Spend an LLM call only on scenes likely to be worth painting."""
+        if not self.use_llm or self._degraded:
+            return False
+        
+        budget = self.config.llm_call_budget
+        if budget is not None and self.llm_calls_this_run >= budget:
+            return False
+        
+        score = estimate_paintability(interaction_type, characters_present, animals_present,
+                                      decision.is_random)
+        return score >= self.config.llm_paintability_threshold
+    
     def _update_character_state(self, character: Character, 
                                interaction: Interaction,
                                decision: Decision):
@@ -269,22 +480,34 @@ class Simulation:
         
         emotional_impact = emotional_impact_map.get(interaction.emotional_temperature, 0.0)
         
+        # One shared record of what happened; each character keeps only
+        # their own importance and emotional impact
+        record = MemoryRecord.shared(
+            interaction.interaction_id,
+            interaction.timestamp,
+            interaction.action_description,
+            interaction.location_id,
+            tuple(c.id for c in characters_present)
+        )
+        memory_type = "interaction" if len(characters_present) > 1 else "observation"
+        
         # Store memory for each character
         for char in characters_present:
-            other_chars = [c.id for c in characters_present if c.id != char.id]
-            
             memory = Memory(
-                timestamp=interaction.timestamp,
-                memory_type="interaction" if other_chars else "observation",
-                content=interaction.action_description,
-                location=interaction.location_id,
-                other_characters=other_chars,
+                memory_type=memory_type,
                 importance=importance,
-                emotional_impact=emotional_impact
+                emotional_impact=emotional_impact,
+                record=record,
+                owner_id=char.id
             )
             
             char.add_memory(memory)
     
+    def consolidate_memories(self) -> int:
+        """Run a consolidation pass over every character; returns summaries created."""
+        return sum(self.memory_consolidator.consolidate(char)
+                   for char in self.world.characters.values())
+    
     def stop(self):
         """Stop the simulation."""
         self.is_running = False
@@ -0,0 +1,224 @@
+"""
+Compiled world bundle.
+
+Loading a world from `data/` lists two directories and parses every JSON
+file. The bundle is one pre-validated file built from those directories:
+
+    MAGIC | uint64 header length | header (JSON) | text blob (UTF-8)
+
+The header holds a manifest (mtime, size and hash of every source file) and
+each character/location's small fields. Bulky fields (backstories,
+descriptions, animal companions, driver and object lists) stay in the blob as JSON at
+(offset, length) and are decoded from a memory map the first time they are
+read, so startup only parses the small header.
+
+The bundle is used only while it matches the source files: a file added,
+removed, or changed in size or content makes it stale, and the world is
+loaded from the JSON directories instead. A file that was only touched is
+rehashed once and its new mtime written back to the manifest. Build it with:
+
+    python -m src.engine.world_bundle [data_dir]
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Callable, Dict, Optional, Tuple
+
+from src.models.character import Animal, Character
+from src.models.location import Location
+
+
+MAGIC = b"AWBUNDLE1\n"
+_LENGTH = struct.Struct("<Q")
+BUNDLE_NAME = "world.bundle"
+
+# Directory -> (model, fields left in the blob until first read)
+SECTIONS = {
+    "characters": (Character, ("physical_description", "backstory", "motivational_drivers",
+                               "relationships", "animal_companion")),
+    "locations": (Location, ("description", "objects_present", "architectural_features")),
+}
+# Lazy fields decoded into a model rather than left as plain JSON
+_CONVERTERS = {"animal_companion": Animal.from_dict}
+
+
+def bundle_path(data_dir: str) -> str:
+    return os.path.join(data_dir, BUNDLE_NAME)
+
+
+def _source_files(data_dir: str) -> Dict[str, os.DirEntry]:
+    """{relative path: directory entry} of every JSON file the world loads."""
+    files = {}
+    for section in SECTIONS:
+        directory = os.path.join(data_dir, section)
+        if not os.path.isdir(directory):
+            continue
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                # Same filter as WorldState.load_*_from_directory
+                if entry.name.startswith('.') or not entry.name.endswith('.json'):
+                    continue
+                files[f"{section}/{entry.name}"] = entry
+    return files
+
+
+def _file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+class _BlobField:
+    """Loader for one field's JSON in the bundle's blob."""
+    __slots__ = ("blob", "offset", "length", "convert")
+
+    def __init__(self, blob: mmap.mmap, offset: int, length: int,
+                 convert: Optional[Callable] = None):
+        self.blob = blob
+        self.offset = offset
+        self.length = length
+        self.convert = convert
+
+    def __call__(self):
+        value = json.loads(self.blob[self.offset:self.offset + self.length])
+        return self.convert(value) if self.convert else value
+
+
+def build_bundle(data_dir: str, path: Optional[str] = None) -> str:
+    """
+    Validate every character/location file and compile them into a bundle.
+
+    Raises:
+        ValueError: If a file does not load as its model
+    """
+    path = path or bundle_path(data_dir)
+    header = {"manifest": {}}
+    blob = bytearray()
+
+    sources = _source_files(data_dir)
+    for section, (model, lazy_fields) in SECTIONS.items():
+        records = []
+        seen = set()
+        for relative in sorted(p for p in sources if p.startswith(f"{section}/")):
+            source = sources[relative]
+            with open(source.path, "rb") as f:
+                raw = f.read()
+            stat = source.stat()
+            header["manifest"][relative] = [stat.st_mtime_ns, stat.st_size,
+                                            hashlib.blake2b(raw, digest_size=16).hexdigest()]
+            data = json.loads(raw)
+            try:
+                model.from_dict(dict(data))
+            except Exception as e:
+                raise ValueError(f"{relative}: {e}") from e
+            if data["id"] in seen:
+                # The JSON loaders keep whichever file comes last, too
+                print(f"Warning: {relative} repeats id {data['id']!r}; it replaces the earlier file")
+                records = [r for r in records if r["id"] != data["id"]]
+            seen.add(data["id"])
+
+            blob_fields = {}
+            for name in lazy_fields:
+                encoded = json.dumps(data.pop(name)).encode("utf-8")
+                blob_fields[name] = [len(blob), len(encoded)]
+                blob.extend(encoded)
+            data["_blob"] = blob_fields
+            records.append(data)
+        header[section] = records
+
+    _write_bundle(path, header, blob)
+    return path
+
+
+def _write_bundle(path: str, header: Dict, blob) -> None:
+    encoded_header = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_LENGTH.pack(len(encoded_header)))
+        f.write(encoded_header)
+        f.write(blob)
+    # Processes still mapping the old bundle keep reading the old inode
+    os.replace(tmp_path, path)
+
+
+def _is_stale(data_dir: str, manifest: Dict) -> bool:
+    """
+    Whether the source files differ from the manifest. Touched but
+    unchanged files get their new mtime recorded in `manifest`.
+    """
+    sources = _source_files(data_dir)
+    if sources.keys() != manifest.keys():
+        return True
+    for relative, source in sources.items():
+        mtime_ns, size, digest = manifest[relative]
+        stat = source.stat()
+        if stat.st_size != size:
+            return True
+        # A touched but unchanged file (e.g. a fresh checkout) is still current
+        if stat.st_mtime_ns != mtime_ns:
+            if _file_hash(source.path) != digest:
+                return True
+            manifest[relative] = [stat.st_mtime_ns, size, digest]
+    return False
+
+
+def load_bundle(data_dir: str, path: Optional[str] = None,
+                journal_dir: Optional[str] = None
+                ) -> Optional[Tuple[Dict[str, Character], Dict[str, Location]]]:
+    """
+    Load characters and locations from the bundle.
+
+    Returns:
+        (characters, locations), or None if the bundle is missing, unreadable
+        or stale (the caller should load the JSON directories instead)
+    """
+    path = path or bundle_path(data_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if blob[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a world bundle")
+        start = len(MAGIC) + _LENGTH.size
+        (header_length,) = _LENGTH.unpack_from(blob, len(MAGIC))
+        header = json.loads(blob[start:start + header_length])
+    except (OSError, ValueError) as e:
+        print(f"World bundle unreadable: {e}. Loading JSON files.")
+        return None
+    manifest = header["manifest"]
+    recorded = {relative: entry[0] for relative, entry in manifest.items()}
+    if _is_stale(data_dir, manifest):
+        print("World bundle is stale. Loading JSON files "
+              "(rebuild with: python -m src.engine.world_bundle).")
+        return None
+
+    blob_start = start + header_length
+    if any(manifest[relative][0] != mtime_ns for relative, mtime_ns in recorded.items()):
+        # Save the rehash for next start (the blob is unchanged)
+        try:
+            _write_bundle(path, header, blob[blob_start:])
+        except OSError as e:
+            print(f"Could not refresh the world bundle manifest: {e}")
+    loaded = []
+    for section, (model, _) in SECTIONS.items():
+        objects = {}
+        for data in header[section]:
+            for name, (offset, length) in data.pop("_blob").items():
+                data[name] = _BlobField(blob, blob_start + offset, length, _CONVERTERS.get(name))
+            obj = model.from_dict(data)
+            if journal_dir and model is Character:
+                obj.attach_memory_journal(journal_dir)
+            objects[obj.id] = obj
+        loaded.append(objects)
+    return loaded[0], loaded[1]
+
+
+if __name__ == "__main__":
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(__file__), "..", "..", "data")
+    built = build_bundle(data_dir)
+    print(f"✓ Built {built}")
@@ -1,27 +1,77 @@
 """
 World state management for the autonomous world simulation.
 """
-from typing import Dict, List, Optional
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
 import json
 import os
+import threading
+import uuid
 
 from src.models.character import Character
+from src.models.memory_store import MemoryCapacity
 from src.models.location import Location, TimeOfDay, Weather
 from src.models.interaction import Interaction
+from src.models.interaction_store import InteractionStore
 
 
 class WorldState:
     """Manages the current state of the simulation world."""
     
-    def __init__(self, characters: Dict[str, Character], locations: Dict[str, Location]):
+    def __init__(self, characters: Dict[str, Character], locations: Dict[str, Location],
+                 memory_capacity: Optional[MemoryCapacity] = None,
+                 interaction_store: Optional[InteractionStore] = None):
+        self.world_id = uuid.uuid4().hex[:12]
         self.characters = characters
         self.locations = locations
+        self.memory_capacity = memory_capacity or MemoryCapacity()
+        for char in characters.values():
+            self.configure_character_memory(char)
         self.current_time = datetime.now()
         self.simulation_start_time = datetime.now()
         self.time_compression = 60  # 1 real minute = 60 simulated minutes
         self.interactions_log: List[Interaction] = []
+        self._log_seqs: List[int] = []  # interactions_log[i].seq, for bisecting
+        self.interaction_store = interaction_store  # Indexed, queryable copy of the log
         
+        # Change sequence (the world's version): bumped for every logged
+        # interaction, character state change and other visible mutation, so
+        # pollers can ask for what is newer and readers can cache by it
+        self.seq = 0
+        self._character_changes: "OrderedDict[str, int]" = OrderedDict()  # id -> seq, oldest first
+        self._character_snapshots: Dict[str, tuple] = {}
+        self._changes_lock = threading.Lock()
+        self._change_listeners: List[Callable] = []
+        
+    def configure_character_memory(self, char: Character):
+        """Apply this world's memory tier capacities to a character."""
+        capacity = self.memory_capacity
+        char.configure_memory(capacity.hot, capacity.warm,
+                              capacity.archive_path(self.world_id, char.id))
+    
+    def add_change_listener(self, listener: Callable):
+        """
+        Call listener(world, characters) after each recorded change: the
+        characters whose location or emotional state changed, or [] for any
+        other visible change (see mark_changed).
+        """
+        self._change_listeners.append(listener)
+    
+    def _notify(self, characters: List[Character]):
+        for listener in self._change_listeners:
+            try:
+                listener(self, characters)
+            except Exception as e:
+                print(f"World change listener failed: {e}")
+    
+    def mark_changed(self):
+        """Bump the version for a change that is not an interaction or character state."""
+        with self._changes_lock:
+            self.seq += 1
+        self._notify([])
+    
     def advance_time(self, minutes: float):
         """Advance simulation time."""
         self.current_time += timedelta(minutes=minutes)
@@ -47,10 +97,15 @@ class WorldState:
         else:
             time_of_day = TimeOfDay.MIDNIGHT
         
+        changed = False
         for location in self.locations.values():
-            location.current_time = time_of_day
+            if location.current_time != time_of_day:
+                location.current_time = time_of_day
+                changed = True
             # Weather changes could be more sophisticated
             # For now, keep it stable unless we implement weather events
+        if changed:
+            self.mark_changed()
     
     def get_characters_at_location(self, location_id: str) -> List[Character]:
         """Get all characters currently at a location."""
@@ -64,12 +119,63 @@ class WorldState:
     
     def add_interaction(self, interaction: Interaction):
         """Log an interaction."""
-        self.interactions_log.append(interaction)
+        with self._changes_lock:
+            self.seq += 1
+            interaction.seq = self.seq
+            self.interactions_log.append(interaction)
+            self._log_seqs.append(self.seq)
+        if self.interaction_store is not None:
+            self.interaction_store.add(self.world_id, interaction)
     
     def get_recent_interactions(self, count: int = 10) -> List[Interaction]:
         """Get the most recent interactions."""
         return self.interactions_log[-count:]
     
+    def record_character_changes(self, characters: Iterable[Character]):
+        """
+        Give a new sequence number to each character whose location or
+        emotional state differs from when it was last recorded.
+        
+        The simulation calls this with the characters a tick involved, so the
+        cost follows activity rather than world size.
+        """
+        changed = []
+        with self._changes_lock:
+            for char in characters:
+                snapshot = (char.current_location, char.emotional_state, char.emotional_intensity)
+                if self._character_snapshots.get(char.id) == snapshot:
+                    continue
+                self._character_snapshots[char.id] = snapshot
+                self.seq += 1
+                self._character_changes[char.id] = self.seq
+                self._character_changes.move_to_end(char.id)
+                changed.append(char)
+        if changed:
+            self._notify(changed)
+    
+    def interactions_since(self, seq: int, limit: int = 100) -> Tuple[List[Interaction], bool]:
+        """
+        Interactions logged after `seq`, oldest first.
+        
+        Returns:
+            (up to `limit` interactions, whether more remain)
+        """
+        with self._changes_lock:
+            start = bisect_right(self._log_seqs, seq)
+            newer = self.interactions_log[start:start + limit + 1]
+        return newer[:limit], len(newer) > limit
+    
+    def characters_changed_since(self, seq: int) -> List[Character]:
+        """Characters whose recorded state changed after `seq`."""
+        changed = []
+        with self._changes_lock:
+            for char_id, changed_at in reversed(self._character_changes.items()):
+                if changed_at <= seq:
+                    break
+                changed.append(char_id)
+        return [self.characters[char_id] for char_id in reversed(changed)
+                if char_id in self.characters]
+    
     def save_session(self, session_name: str, output_dir: str):
         """Save the current session as a markdown field note."""
         os.makedirs(output_dir, exist_ok=True)
@@ -92,8 +198,32 @@ class WorldState:
         return filepath
     
     @classmethod
-    def load_characters_from_directory(cls, directory: str) -> Dict[str, Character]:
-        """Load all character files from a directory."""
+    def load_world(cls, data_dir: str, journal_dir: Optional[str] = None
+                   ) -> Tuple[Dict[str, Character], Dict[str, Location]]:
+        """
+        Load characters and locations from `data_dir`.
+        
+        Uses the compiled world bundle when it is current, otherwise parses
+        the `characters/` and `locations/` JSON files.
+        """
+        from src.engine.world_bundle import load_bundle
+        bundled = load_bundle(data_dir, journal_dir=journal_dir)
+        if bundled is not None:
+            return bundled
+        characters = cls.load_characters_from_directory(os.path.join(data_dir, 'characters'),
+                                                        journal_dir)
+        locations = cls.load_locations_from_directory(os.path.join(data_dir, 'locations'))
+        return characters, locations
+    
+    @classmethod
+    def load_characters_from_directory(cls, directory: str,
+                                       journal_dir: Optional[str] = None) -> Dict[str, Character]:
+        """
+        Load all character files from a directory.
+        
+        With `journal_dir`, each character's memories persist in a journal
+        there; journals are only read when a character's memories are first used.
+        """
         characters = {}
         for filename in os.listdir(directory):
             # Skip hidden files and macOS metadata files
@@ -101,7 +231,7 @@ class WorldState:
                 continue
             if filename.endswith('.json'):
                 filepath = os.path.join(directory, filename)
-                char = Character.load_from_file(filepath)
+                char = Character.load_from_file(filepath, journal_dir)
                 characters[char.id] = char
         return characters
     
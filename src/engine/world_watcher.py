@@ -0,0 +1,129 @@
+"""
+Hot reload of character and location definitions.
+
+A WorldWatcher polls `data/characters` and `data/locations` for JSON files
+whose mtime or size changed, re-parses only those, and merges their authored
+fields into the live objects (Character/Location.update_definition), so
+location, emotional state and memories survive an edit. New files add new
+characters/locations to the running world; deleted files are left alone,
+since a running simulation may still refer to them.
+
+Polling (one stat per file per interval) needs no extra dependency and
+behaves the same on every platform and inside containers.
+"""
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.models.character import Character
+from src.models.location import Location
+
+
+# Directory under data/ -> (model, WorldState attribute holding its objects)
+WATCHED = {
+    "characters": (Character, "characters"),
+    "locations": (Location, "locations"),
+}
+
+
+class WorldWatcher:
+    """Merges edited world definitions into a running WorldState."""
+
+    def __init__(self, world_state, data_dir: str, interval: float = 1.0,
+                 journal_dir: Optional[str] = None):
+        """
+        Args:
+            world_state: World to update (can be swapped later via .world_state)
+            data_dir: Directory containing characters/ and locations/
+            interval: Seconds between polls when running in the background
+            journal_dir: Memory journal directory for newly added characters
+        """
+        self.world_state = world_state
+        self.data_dir = data_dir
+        self.interval = interval
+        self.journal_dir = journal_dir
+        self._seen = self._scan()  # Files present now are already loaded
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """{path: (mtime_ns, size)} of every watched JSON file."""
+        found = {}
+        for section in WATCHED:
+            directory = os.path.join(self.data_dir, section)
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # Same filter as WorldState.load_*_from_directory
+                    if entry.name.startswith('.') or not entry.name.endswith('.json'):
+                        continue
+                    stat = entry.stat()
+                    found[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return found
+
+    def check(self) -> Dict[str, List[str]]:
+        """
+        Reload whatever changed since the last check.
+
+        Returns:
+            {"updated": [ids], "added": [ids], "errors": [messages]}
+        """
+        changes = {"updated": [], "added": [], "errors": []}
+        with self._lock:
+            current = self._scan()
+            changed = [path for path, signature in current.items()
+                       if self._seen.get(path) != signature]
+            for path in changed:
+                try:
+                    self._reload(path, changes)
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    # Usually a file caught mid-save; it is retried once it changes again
+                    changes["errors"].append(f"{os.path.basename(path)}: {e}")
+                    print(f"Hot reload skipped {path}: {e}")
+            self._seen = current
+        if changes["updated"] or changes["added"]:
+            self.world_state.mark_changed()
+        return changes
+
+    def _reload(self, path: str, changes: Dict[str, List[str]]):
+        section = os.path.basename(os.path.dirname(path))
+        model, attribute = WATCHED[section]
+        with open(path) as f:
+            fresh = model.from_dict(json.load(f))
+
+        world = self.world_state
+        objects = getattr(world, attribute)
+        live = objects.get(fresh.id)
+        if live is not None:
+            live.update_definition(fresh)
+            changes["updated"].append(fresh.id)
+            return
+
+        if model is Character:
+            if self.journal_dir:
+                fresh.attach_memory_journal(self.journal_dir)
+            world.configure_character_memory(fresh)
+        # Copy-on-write: the simulation thread may be iterating the old dict
+        setattr(world, attribute, {**objects, fresh.id: fresh})
+        changes["added"].append(fresh.id)
+
+    def start(self):
+        """Poll in a background thread until stop()."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Hot reload check failed: {e}")
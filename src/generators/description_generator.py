@@ -1,20 +1,23 @@
 """
 LLM-based description generator for vivid field notes.
 
-This module can be configured to use different LLM backends:
+This module can be configured to use different LLM backends
+(see src/llm/providers.py and the `llm.provider` config key):
 - OpenAI API (GPT-4, GPT-3.5)
-- Anthropic Claude
-- Local models via Ollama
+- Local OpenAI-compatible servers (Ollama, llama.cpp)
 - Or fallback to template-based generation
 """
-import os
 import json
-from typing import Optional, Dict, List
+import time
+from typing import Optional, Dict, List, Callable
 from datetime import datetime
 
 from src.models.character import Character
 from src.models.location import Location
-from src.models.interaction import InteractionType, EmotionalTemperature
+from src.models.interaction import InteractionType, EmotionalTemperature, pooled_text
+from src.llm.providers import LLMProvider, LLMProviderError, create_provider
+from src.llm.gateway import Priority, gate
+from src.llm.streaming import IncrementalJSONFieldParser
 
 # Exposed status dictionary so the API can report whether LLM mode is active.
 LLM_STATUS = {
@@ -22,6 +25,7 @@ LLM_STATUS = {
     "llm_enabled": False,
     "has_api_key": False,
     "model": None,
+    "provider": None,
     "last_error": None
 }
 
@@ -30,40 +34,58 @@ class DescriptionGenerator:
     """Generates vivid, specific descriptions for interactions."""
     
     def __init__(self, use_llm: bool = True, api_key: Optional[str] = None,
-                 model: str = "gpt-4o"):
+                 model: Optional[str] = None, provider: Optional[LLMProvider] = None,
+                 session_id: str = "default"):
         """
         Args:
             use_llm: If True, use LLM. If False, use templates.
             api_key: API key for LLM service (or set OPENAI_API_KEY env var)
-            model: Model name (gpt-4o, gpt-4, gpt-3.5-turbo, etc.)
+            model: Model name (gpt-4o, llama3, ...). Defaults to llm.model in config.
+            provider: Explicit LLM backend. Defaults to llm.provider in config.
+            session_id: Session whose interactive LLM share this generator uses
         """
         global LLM_STATUS
         self.use_llm = use_llm
+        self.provider = None
         self.model = model
         
         LLM_STATUS["llm_requested"] = use_llm
-        LLM_STATUS["model"] = model
         
         if use_llm:
-            self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
-            if not self.api_key:
+            try:
+                self.provider = gate(provider or create_provider(model=model, api_key=api_key),
+                                     Priority.INTERACTIVE, session_id)
+            except ValueError as e:
+                print(f"⚠️  {e}. Falling back to TEMPLATE-BASED GENERATION.")
+                self.provider = None
+            
+            self.model = self.provider.model if self.provider else model
+            self.api_key = getattr(self.provider, "api_key", None)
+            LLM_STATUS["model"] = self.model
+            LLM_STATUS["provider"] = self.provider.name if self.provider else None
+            
+            reason = self.provider.unavailable_reason if self.provider else "no usable LLM provider"
+            if reason:
                 print("=" * 80)
-                print("⚠️  ⚠️  ⚠️  WARNING: NO API KEY FOUND ⚠️  ⚠️  ⚠️")
-                print("Set OPENAI_API_KEY in environment variables to use LLM mode.")
+                print("⚠️  ⚠️  ⚠️  WARNING: LLM PROVIDER NOT AVAILABLE ⚠️  ⚠️  ⚠️")
+                print(f"Reason: {reason}")
+                print("Set OPENAI_API_KEY, or point llm.provider at a local endpoint.")
                 print("Falling back to TEMPLATE-BASED GENERATION (limited variety)")
                 print("=" * 80)
                 self.use_llm = False
                 LLM_STATUS["llm_enabled"] = False
-                LLM_STATUS["has_api_key"] = False
-                LLM_STATUS["last_error"] = "OPENAI_API_KEY missing"
+                LLM_STATUS["has_api_key"] = bool(self.api_key)
+                LLM_STATUS["last_error"] = reason
             else:
-                print(f"✓ LLM mode enabled with model: {self.model}")
-                print(f"✓ API key found: {self.api_key[:8]}...{self.api_key[-4:]}")
+                print(f"✓ LLM mode enabled with {self.provider.describe()}")
+                if self.api_key:
+                    print(f"✓ API key found: {self.api_key[:8]}...{self.api_key[-4:]}")
                 LLM_STATUS["llm_enabled"] = True
-                LLM_STATUS["has_api_key"] = True
+                LLM_STATUS["has_api_key"] = bool(self.api_key)
                 LLM_STATUS["last_error"] = None
         else:
             self.api_key = None
+            LLM_STATUS["model"] = model
             LLM_STATUS["llm_enabled"] = False
             LLM_STATUS["has_api_key"] = False
             LLM_STATUS["last_error"] = "LLM disabled for this simulation"
@@ -75,17 +97,29 @@ class DescriptionGenerator:
         characters: List[Character],
         action_context: str,
         time_of_day: str,
-        weather: str
+        weather: str,
+        on_partial: Optional[Callable[[str, str], None]] = None,
+        use_llm: Optional[bool] = None,
+        time_limit: Optional[float] = None
     ) -> tuple[str, str, EmotionalTemperature, str]:
         """
         Generate vivid description of an interaction.
 
+        Args:
+            on_partial: If given, the LLM reply is streamed and this is called
+                with (field, text_so_far) each time a JSON field grows
+            use_llm: Per-call override; False forces templates for this scene
+                (None = use the generator's setting)
+            time_limit: Seconds the LLM call may take at most (default: the
+                provider's timeout); past it the scene falls back to templates
+
         Returns:
             (action_description, material_details, emotional_temperature, cinematic_report)
         """
-        if self.use_llm:
+        if self.use_llm and use_llm is not False:
             return self._generate_with_llm(interaction_type, location, characters,
-                                          action_context, time_of_day, weather)
+                                          action_context, time_of_day, weather,
+                                          on_partial=on_partial, time_limit=time_limit)
         else:
             return self._generate_with_template(interaction_type, location, characters,
                                                action_context, time_of_day, weather)
@@ -97,9 +131,11 @@ class DescriptionGenerator:
         characters: List[Character],
         action_context: str,
         time_of_day: str,
-        weather: str
+        weather: str,
+        on_partial: Optional[Callable[[str, str], None]] = None,
+        time_limit: Optional[float] = None
     ) -> tuple[str, str, EmotionalTemperature]:
-        """Generate description using LLM."""
+        """Generate description using LLM (streamed when on_partial is given)."""
         
         # Build context for the LLM
         prompt = self._build_prompt(interaction_type, location, characters,
@@ -107,10 +143,7 @@ class DescriptionGenerator:
         
         global LLM_STATUS
         try:
-            # Try to use OpenAI API (new v1.0+ syntax)
-            from openai import OpenAI
-            client = OpenAI(api_key=self.api_key)
-            print(f"🤖 Calling LLM ({self.model}) for interaction description...")
+            print(f"🤖 Calling LLM ({self.provider.describe()}) for interaction description...")
             
             # Few-shot examples showing variety AND conversation
             import random
@@ -145,21 +178,39 @@ class DescriptionGenerator:
             # Pick 1-2 examples randomly to show variety
             few_shot_example = random.choice(few_shot_examples)
             
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": "Generate a field note with Measurer and Collector talking."},
-                    few_shot_example,  # Show example with actual dialogue
-                    {"role": "user", "content": prompt}
-                ],
+            messages = [
+                {"role": "system", "content": self._get_system_prompt()},
+                {"role": "user", "content": "Generate a field note with Measurer and Collector talking."},
+                few_shot_example,  # Show example with actual dialogue
+                {"role": "user", "content": prompt}
+            ]
+            params = dict(
                 temperature=1.8,  # EXTREME creativity - force maximum variety
                 max_tokens=350,
                 presence_penalty=1.0,  # Maximum penalty for repetition
                 frequency_penalty=1.0   # Maximum penalty for repeated words
             )
+            deadline = None
+            if time_limit is not None:
+                params["timeout"] = max(0.1, min(self.provider.timeout, time_limit))
+                deadline = time.monotonic() + params["timeout"]
+            
+            if on_partial is None:
+                result = self.provider.chat(messages, **params)
+            else:
+                # Forward fields as they grow; the interaction itself is only
+                # built once the complete reply has been parsed below.
+                parser = IncrementalJSONFieldParser()
+                chunks = []
+                for delta in self.provider.stream_chat(messages, **params):
+                    # The timeout bounds each read, not the whole stream
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise LLMProviderError(f"no complete reply within {time_limit:.1f}s")
+                    chunks.append(delta)
+                    for field_name, text in parser.feed(delta):
+                        on_partial(field_name, text)
+                result = "".join(chunks)
             
-            result = response.choices[0].message.content
             LLM_STATUS["last_error"] = None
             LLM_STATUS["llm_enabled"] = True
             return self._parse_llm_response(result)
@@ -592,4 +643,5 @@ BE CREATIVE. BE SPECIFIC. BE VARIED. Don't phone it in."""
 
         cinematic = f"{random.choice(camera_movements)}. {random.choice(compositions).format(random.choice(['industrial', 'distant', 'architectural', 'urban']))}. {random.choice(lighting_descriptions)}."
 
-        return action, material, temp, cinematic
+        # Template text recurs across ticks; share one copy of each string
+        return pooled_text(action), pooled_text(material), temp, pooled_text(cinematic)
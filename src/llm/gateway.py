@@ -0,0 +1,286 @@
+"""
+Priority-scheduled gateway for LLM calls.
+
+Simulation ticks, paintable-moment extraction, LoRA export and memory
+embeddings all share one provider (and one rate limit). Every call is
+routed through a process-wide LLMGateway that hands out a limited number of
+concurrent slots:
+- Priority classes: INTERACTIVE (live simulation ticks) beats EXTRACTION
+  (UI-triggered prompt extraction) beats BACKGROUND (exports, embeddings).
+- Per-class concurrency limits, plus slots reserved for interactive work
+  (by default every slot but the background class's), so extraction and
+  background work can never occupy the slots interactive ticks need.
+- Weighted fair queuing between sessions within a class, so one busy
+  session can't starve another.
+- Bounded waits: a call with a timeout gives up (GatewayTimeout) rather
+  than queue past it, and the wait comes out of the call's own timeout.
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Callable, Dict, Iterator, List, Optional
+
+from src.llm.providers import LLMProvider, LLMProviderError
+from src.utils.config_loader import ConfigLoader
+
+
+class Priority(IntEnum):
+    """Priority classes, lowest value served first."""
+    INTERACTIVE = 0
+    EXTRACTION = 1
+    BACKGROUND = 2
+
+
+DEFAULT_CLASS_LIMITS = {
+    Priority.INTERACTIVE: 4,
+    Priority.EXTRACTION: 2,
+    Priority.BACKGROUND: 1
+}
+
+
+class GatewayTimeout(LLMProviderError):
+    """Raised when no slot was granted within the caller's timeout."""
+
+
+class _Ticket:
+    """A caller waiting for a slot."""
+
+    def __init__(self, priority: Priority, session_id: str, start: float, tag: float, seq: int):
+        self.priority = priority
+        self.session_id = session_id
+        self.start = start  # virtual start time for fair queuing
+        self.tag = tag  # virtual finish time; smaller is served first
+        self.seq = seq
+        self.granted = False
+
+    def sort_key(self):
+        return (self.priority, self.tag, self.seq)
+
+
+class LLMGateway:
+    """Hands out LLM call slots by priority class and session fairness."""
+
+    def __init__(self, max_concurrent: int = 4,
+                 class_limits: Optional[Dict[Priority, int]] = None,
+                 interactive_reserved: Optional[int] = None):
+        """
+        Args:
+            max_concurrent: Total calls in flight across all classes
+            class_limits: Max calls in flight per priority class
+            interactive_reserved: Slots only INTERACTIVE calls may use
+                (default: max_concurrent minus the background limit)
+        """
+        self.max_concurrent = max_concurrent
+        self.class_limits = dict(DEFAULT_CLASS_LIMITS)
+        self.class_limits.update(class_limits or {})
+        if interactive_reserved is None:
+            interactive_reserved = max_concurrent - self.class_limits[Priority.BACKGROUND]
+        self.interactive_reserved = max(0, min(interactive_reserved, max_concurrent))
+        self.session_weights: Dict[str, float] = {}
+
+        self._cond = threading.Condition()
+        self._waiting: List[_Ticket] = []
+        self._running = {p: 0 for p in Priority}
+        self._completed = {p: 0 for p in Priority}
+        self._session_tags: Dict[tuple, float] = {}  # (priority, session) -> last tag
+        self._virtual_time = {p: 0.0 for p in Priority}
+        self._seq = itertools.count()
+
+    def set_session_weight(self, session_id: str, weight: float):
+        """Give a session a larger (or smaller) share of its class's slots."""
+        with self._cond:
+            self.session_weights[session_id] = max(weight, 0.01)
+
+    @contextmanager
+    def slot(self, priority: Priority, session_id: str = "default",
+             timeout: Optional[float] = None):
+        """
+        Block until a slot is granted, hold it for the duration of the block.
+
+        Raises:
+            GatewayTimeout: if `timeout` seconds pass without a slot
+        """
+        ticket = self._acquire(Priority(priority), session_id, timeout)
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    def submit(self, fn: Callable, priority: Priority, session_id: str = "default",
+               timeout: Optional[float] = None):
+        """Run fn() once a slot is available and return its result."""
+        with self.slot(priority, session_id, timeout):
+            return fn()
+
+    def bind(self, provider: LLMProvider, priority: Priority,
+             session_id: str = "default") -> "GatedProvider":
+        """Wrap a provider so all of its calls go through this gateway."""
+        return GatedProvider(provider, self, priority, session_id)
+
+    def _acquire(self, priority: Priority, session_id: str,
+                 timeout: Optional[float] = None) -> _Ticket:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            weight = self.session_weights.get(session_id, 1.0)
+            key = (priority, session_id)
+            start = max(self._session_tags.get(key, 0.0), self._virtual_time[priority])
+            tag = start + 1.0 / weight
+            self._session_tags[key] = tag
+
+            ticket = _Ticket(priority, session_id, start, tag, next(self._seq))
+            self._waiting.append(ticket)
+            self._dispatch()
+            while not ticket.granted:
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    # Don't charge the session for a call that never ran
+                    if self._session_tags.get(key) == tag:
+                        self._session_tags[key] = start
+                    raise GatewayTimeout(f"no {priority.name.lower()} LLM slot within {timeout:.1f}s")
+                self._cond.wait(remaining)
+            return ticket
+
+    def _release(self, ticket: _Ticket):
+        with self._cond:
+            self._running[ticket.priority] -= 1
+            self._completed[ticket.priority] += 1
+            self._dispatch()
+
+    def _dispatch(self):
+        """Grant slots to waiting tickets in priority/fairness order (lock held)."""
+        if not self._waiting:
+            return
+        self._waiting.sort(key=_Ticket.sort_key)
+        still_waiting = []
+        granted = False
+        shared_slots = self.max_concurrent - self.interactive_reserved
+        for ticket in self._waiting:
+            in_flight = sum(self._running.values())
+            non_interactive = in_flight - self._running[Priority.INTERACTIVE]
+            if (in_flight < self.max_concurrent
+                    and self._running[ticket.priority] < self.class_limits[ticket.priority]
+                    # Other classes only share what the interactive reserve leaves
+                    and (ticket.priority == Priority.INTERACTIVE
+                         or non_interactive < shared_slots)):
+                ticket.granted = True
+                self._running[ticket.priority] += 1
+                self._virtual_time[ticket.priority] = max(self._virtual_time[ticket.priority],
+                                                          ticket.start)
+                granted = True
+            else:
+                still_waiting.append(ticket)
+        self._waiting = still_waiting
+        if granted:
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict:
+        """Current queue depth and throughput per priority class."""
+        with self._cond:
+            waiting = {p: 0 for p in Priority}
+            for ticket in self._waiting:
+                waiting[ticket.priority] += 1
+            stats = {
+                p.name.lower(): {
+                    "running": self._running[p],
+                    "waiting": waiting[p],
+                    "completed": self._completed[p],
+                    "limit": self.class_limits[p]
+                }
+                for p in Priority
+            }
+            stats["interactive_reserved"] = self.interactive_reserved
+            return stats
+
+
+class GatedProvider(LLMProvider):
+    """An LLMProvider whose calls wait for a gateway slot first."""
+
+    def __init__(self, inner: LLMProvider, gateway: LLMGateway, priority: Priority,
+                 session_id: str = "default"):
+        self.inner = inner
+        self.gateway = gateway
+        self.priority = Priority(priority)
+        self.session_id = session_id
+
+    @property
+    def name(self):
+        return self.inner.name
+
+    @property
+    def model(self):
+        return self.inner.model
+
+    @property
+    def embedding_model(self):
+        return self.inner.embedding_model
+
+    @property
+    def timeout(self):
+        return self.inner.timeout
+
+    @property
+    def api_key(self):
+        return getattr(self.inner, "api_key", None)
+
+    @property
+    def unavailable_reason(self) -> Optional[str]:
+        return self.inner.unavailable_reason
+
+    def describe(self) -> str:
+        return self.inner.describe()
+
+    @contextmanager
+    def _slot(self, params: Dict):
+        """A slot, waited for no longer than the call's `timeout` param (if any)."""
+        timeout = params.get("timeout")
+        started = time.monotonic()
+        with self.gateway.slot(self.priority, self.session_id, timeout):
+            if timeout is not None:
+                # Time spent queued comes out of the call's own timeout
+                params["timeout"] = max(0.1, timeout - (time.monotonic() - started))
+            yield
+
+    def chat(self, messages: List[Dict], **params) -> str:
+        with self._slot(params):
+            return self.inner.chat(messages, **params)
+
+    def stream_chat(self, messages: List[Dict], **params) -> Iterator[str]:
+        with self._slot(params):
+            yield from self.inner.stream_chat(messages, **params)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        with self.gateway.slot(self.priority, self.session_id):
+            return self.inner.embed(texts)
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway(config: Optional[ConfigLoader] = None) -> LLMGateway:
+    """Process-wide gateway, configured from `llm.gateway` on first use."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            config = config or ConfigLoader()
+            limits = config.get("llm.gateway.class_limits", {})
+            _gateway = LLMGateway(
+                max_concurrent=config.get("llm.gateway.max_concurrent", 4),
+                class_limits={Priority[name.upper()]: value for name, value in limits.items()},
+                interactive_reserved=config.get("llm.gateway.interactive_reserved")
+            )
+        return _gateway
+
+
+def gate(provider: Optional[LLMProvider], priority: Priority,
+         session_id: str = "default") -> Optional[LLMProvider]:
+    """Bind a provider to the process-wide gateway (None passes through)."""
+    if provider is None or isinstance(provider, GatedProvider):
+        return provider
+    return get_gateway().bind(provider, priority, session_id)
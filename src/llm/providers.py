@@ -0,0 +1,303 @@
+"""
+LLM provider backends.
+
+Everything that talks to a language model (DescriptionGenerator,
+PromptExtractor, MemorySearchEngine) goes through an LLMProvider, so the
+backend is chosen by the `llm.provider` config key instead of being
+hard-wired at each call site:
+- "openai": OpenAI API via the openai package
+- "local" (aliases "ollama", "llamacpp"): any OpenAI-compatible HTTP
+  endpoint running on this machine, e.g. `ollama serve` or llama.cpp's
+  `llama-server`. Uses only the standard library, so it works on boxes
+  without the openai package or network access.
+"""
+import json
+import os
+import urllib.error
+import urllib.request
+from typing import Dict, Iterator, List, Optional
+
+from src.utils.config_loader import ConfigLoader
+
+
+DEFAULT_LOCAL_BASE_URL = "http://127.0.0.1:11434/v1"
+LOCAL_PROVIDER_NAMES = ("local", "ollama", "llamacpp", "llama.cpp")
+
+
+class LLMProviderError(Exception):
+    """Raised when a provider cannot complete a request."""
+
+
+class LLMProvider:
+    """Common interface for chat-completion and embedding backends."""
+
+    name = "base"
+
+    def __init__(self, model: str, embedding_model: Optional[str] = None,
+                 timeout: float = 60.0):
+        """
+        Args:
+            model: Chat model name
+            embedding_model: Model used for embeddings (None = no embeddings)
+            timeout: Request timeout in seconds
+        """
+        self.model = model
+        self.embedding_model = embedding_model
+        self.timeout = timeout
+
+    @property
+    def is_available(self) -> bool:
+        """Whether the provider is configured well enough to be called."""
+        return self.unavailable_reason is None
+
+    @property
+    def unavailable_reason(self) -> Optional[str]:
+        """Why the provider can't be used, or None if it can."""
+        return None
+
+    def describe(self) -> str:
+        """Short label for logs and diagnostics."""
+        return f"{self.name}:{self.model}"
+
+    def chat(self, messages: List[Dict], **params) -> str:
+        """
+        Run a chat completion.
+
+        Args:
+            messages: OpenAI-style [{"role": ..., "content": ...}] list
+            **params: Sampling parameters (temperature, max_tokens, ...);
+                `timeout` (seconds) overrides the provider's for this call
+
+        Returns:
+            The assistant message text
+        """
+        raise NotImplementedError
+
+    def stream_chat(self, messages: List[Dict], **params) -> Iterator[str]:
+        """
+        Run a chat completion, yielding text deltas as they arrive.
+
+        Backends without streaming support yield the whole reply at once.
+        """
+        yield self.chat(messages, **params)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts, returning one vector per input in order."""
+        raise NotImplementedError
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI API backend (requires the openai package and an API key)."""
+
+    name = "openai"
+
+    def __init__(self, model: str = "gpt-4o", api_key: Optional[str] = None,
+                 embedding_model: Optional[str] = "text-embedding-3-small",
+                 timeout: float = 60.0, api_key_env_var: str = "OPENAI_API_KEY"):
+        super().__init__(model, embedding_model, timeout)
+        self.api_key_env_var = api_key_env_var
+        self.api_key = api_key or os.environ.get(api_key_env_var)
+        self._client = None
+
+    @property
+    def unavailable_reason(self) -> Optional[str]:
+        if not self.api_key:
+            return f"{self.api_key_env_var} missing"
+        return None
+
+    def _get_client(self):
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key, timeout=self.timeout)
+        return self._client
+
+    def chat(self, messages: List[Dict], **params) -> str:
+        response = self._get_client().chat.completions.create(
+            model=self.model,
+            messages=messages,
+            **params
+        )
+        return response.choices[0].message.content
+
+    def stream_chat(self, messages: List[Dict], **params) -> Iterator[str]:
+        stream = self._get_client().chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True,
+            **params
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        response = self._get_client().embeddings.create(
+            model=self.embedding_model,
+            input=texts
+        )
+        ordered = sorted(response.data, key=lambda d: d.index)
+        return [d.embedding for d in ordered]
+
+
+class LocalOpenAICompatibleProvider(LLMProvider):
+    """
+    Backend for a local OpenAI-compatible server (Ollama, llama.cpp, vLLM).
+
+    Talks plain HTTP+JSON to `{base_url}/chat/completions` and
+    `{base_url}/embeddings`, so no extra packages are needed.
+    """
+
+    name = "local"
+
+    def __init__(self, model: str, base_url: str = DEFAULT_LOCAL_BASE_URL,
+                 api_key: Optional[str] = None,
+                 embedding_model: Optional[str] = None, timeout: float = 120.0):
+        super().__init__(model, embedding_model or model, timeout)
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+
+    def describe(self) -> str:
+        return f"{self.name}:{self.model}@{self.base_url}"
+
+    def _open(self, path: str, payload: Dict, timeout: Optional[float] = None):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        req = urllib.request.Request(
+            f"{self.base_url}{path}",
+            data=json.dumps(payload).encode("utf-8"),
+            headers=headers,
+            method="POST"
+        )
+        try:
+            return urllib.request.urlopen(req, timeout=timeout or self.timeout)
+        except urllib.error.HTTPError as e:
+            body = e.read().decode("utf-8", errors="replace")[:200]
+            raise LLMProviderError(f"{self.describe()} returned HTTP {e.code}: {body}") from e
+        except (urllib.error.URLError, OSError) as e:
+            raise LLMProviderError(f"{self.describe()} unreachable: {e}") from e
+
+    def _post(self, path: str, payload: Dict, timeout: Optional[float] = None) -> Dict:
+        with self._open(path, payload, timeout) as resp:
+            try:
+                return json.loads(resp.read().decode("utf-8"))
+            except (ValueError, OSError) as e:
+                raise LLMProviderError(f"Bad response from {self.describe()}: {e}") from e
+
+    def chat(self, messages: List[Dict], **params) -> str:
+        timeout = params.pop("timeout", None)
+        payload = {"model": self.model, "messages": messages}
+        payload.update(params)
+        data = self._post("/chat/completions", payload, timeout)
+        try:
+            return data["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError) as e:
+            raise LLMProviderError(f"Malformed completion from {self.describe()}") from e
+
+    def stream_chat(self, messages: List[Dict], **params) -> Iterator[str]:
+        timeout = params.pop("timeout", None)
+        payload = {"model": self.model, "messages": messages, "stream": True}
+        payload.update(params)
+        with self._open("/chat/completions", payload, timeout) as resp:
+            # Server-sent events: "data: {...}" lines, terminated by "data: [DONE]"
+            for raw in resp:
+                line = raw.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    delta = json.loads(data)["choices"][0].get("delta", {})
+                except (ValueError, KeyError, IndexError) as e:
+                    raise LLMProviderError(f"Malformed stream chunk from {self.describe()}") from e
+                if delta.get("content"):
+                    yield delta["content"]
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        data = self._post("/embeddings", {"model": self.embedding_model, "input": texts})
+        try:
+            ordered = sorted(data["data"], key=lambda d: d.get("index", 0))
+            return [d["embedding"] for d in ordered]
+        except (KeyError, TypeError) as e:
+            raise LLMProviderError(f"Malformed embeddings from {self.describe()}") from e
+
+
+def _build_provider(spec: Dict, api_key: Optional[str], config: ConfigLoader) -> LLMProvider:
+    """Build one provider from a spec dict; missing keys fall back to the llm section."""
+    name = spec.get("provider", "openai").lower()
+    model = spec.get("model") or config.get("llm.model", "gpt-4o")
+    embedding_model = spec.get("embedding_model", config.get("llm.embedding_model"))
+    timeout = spec.get("timeout_seconds", config.get("llm.timeout_seconds", 60))
+
+    if name in LOCAL_PROVIDER_NAMES:
+        base_url = spec.get("base_url") or config.get("llm.base_url", DEFAULT_LOCAL_BASE_URL)
+        return LocalOpenAICompatibleProvider(
+            model=model,
+            base_url=base_url,
+            api_key=os.environ.get("LLM_API_KEY"),
+            embedding_model=embedding_model,
+            timeout=timeout
+        )
+
+    if name == "openai":
+        return OpenAIProvider(
+            model=model,
+            api_key=api_key,
+            embedding_model=embedding_model or "text-embedding-3-small",
+            timeout=timeout,
+            api_key_env_var=spec.get("api_key_env_var",
+                                     config.get("llm.api_key_env_var", "OPENAI_API_KEY"))
+        )
+
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+
+def create_provider(
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+    api_key: Optional[str] = None,
+    config: Optional[ConfigLoader] = None
+) -> LLMProvider:
+    """
+    Build the provider described by the `llm` config section.
+
+    If `llm.providers` lists more than one backend (and no explicit provider
+    is requested), returns an LLMRouter over all of them, tuned by
+    `llm.routing`. Environment overrides: LLM_PROVIDER, LLM_BASE_URL,
+    LLM_MODEL and LLM_API_KEY (the latter only for local endpoints that
+    want a token).
+
+    Args:
+        provider: Provider name; overrides config/env when given
+        model: Chat model; overrides config/env when given
+        api_key: API key for hosted providers
+        config: Config to read (default: config/default_config.json)
+    """
+    config = config or ConfigLoader()
+    provider = provider or os.environ.get("LLM_PROVIDER")
+    specs = config.get("llm.providers") or []
+
+    if provider is None and len(specs) > 1:
+        from src.llm.router import LLMRouter
+        routing = config.get("llm.routing", {})
+        return LLMRouter(
+            [_build_provider(spec, api_key, config) for spec in specs],
+            alpha=routing.get("latency_alpha", 0.3),
+            max_error_rate=routing.get("max_error_rate", 0.5),
+            cooldown_seconds=routing.get("cooldown_seconds", 30.0),
+            explore_rate=routing.get("explore_rate", 0.05)
+        )
+
+    spec = dict(specs[0]) if specs and provider is None else {}
+    spec["provider"] = provider or spec.get("provider") or config.get("llm.provider", "openai")
+    if model or os.environ.get("LLM_MODEL"):
+        spec["model"] = model or os.environ.get("LLM_MODEL")
+    if os.environ.get("LLM_BASE_URL"):
+        spec["base_url"] = os.environ["LLM_BASE_URL"]
+    return _build_provider(spec, api_key, config)
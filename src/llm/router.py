@@ -0,0 +1,186 @@
+"""
+Latency-aware routing across several LLM providers.
+
+The router is itself an LLMProvider, so DescriptionGenerator and
+PromptExtractor use it exactly like a single backend. Each call goes to the
+fastest healthy provider according to a moving (EWMA) latency estimate; a
+provider that fails is tried last until its cooldown expires. When every
+provider fails the error propagates and callers fall back to templates.
+"""
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from src.llm.providers import LLMProvider, LLMProviderError
+
+
+class ProviderStats:
+    """Moving latency and error-rate estimate for one provider."""
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.latency: Optional[float] = None  # EWMA seconds, None until first success
+        self.error_rate = 0.0  # EWMA of failures (0.0-1.0)
+        self.calls = 0
+        self.failures = 0
+        self.last_failure_at = 0.0
+        self.last_error: Optional[str] = None
+
+    def record_success(self, latency: float):
+        self.calls += 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = self.alpha * latency + (1 - self.alpha) * self.latency
+        self.error_rate = (1 - self.alpha) * self.error_rate
+
+    def record_failure(self, error: Exception):
+        self.calls += 1
+        self.failures += 1
+        self.last_failure_at = time.monotonic()
+        self.last_error = str(error)
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+
+    def to_dict(self) -> Dict:
+        return {
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "calls": self.calls,
+            "failures": self.failures,
+            "last_error": self.last_error
+        }
+
+
+class LLMRouter(LLMProvider):
+    """Routes each call to the currently fastest healthy provider."""
+
+    name = "router"
+
+    def __init__(self, providers: List[LLMProvider], alpha: float = 0.3,
+                 max_error_rate: float = 0.5, cooldown_seconds: float = 30.0,
+                 explore_rate: float = 0.05):
+        """
+        Args:
+            providers: Backends to route across, in preference order
+            alpha: EWMA smoothing factor for latency and error rate
+            max_error_rate: Providers above this error rate count as unhealthy
+            cooldown_seconds: How long an unhealthy provider is tried last
+            explore_rate: Chance of sending a call to a slower healthy provider
+                so its latency estimate doesn't go stale
+        """
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        # `model` names the preferred backend and never changes: calls run
+        # concurrently, so which provider served one is only in get_stats()
+        super().__init__(providers[0].model, providers[0].embedding_model,
+                         max(p.timeout for p in providers))
+        self.providers = providers
+        self.max_error_rate = max_error_rate
+        self.cooldown_seconds = cooldown_seconds
+        self.explore_rate = explore_rate
+        self.stats = {id(p): ProviderStats(alpha) for p in providers}
+        self._lock = threading.Lock()
+
+    @property
+    def unavailable_reason(self) -> Optional[str]:
+        if any(p.is_available for p in self.providers):
+            return None
+        return "; ".join(p.unavailable_reason for p in self.providers)
+
+    def describe(self) -> str:
+        return f"router[{', '.join(p.describe() for p in self.providers)}]"
+
+    def _is_healthy(self, provider: LLMProvider, now: float) -> bool:
+        stats = self.stats[id(provider)]
+        if stats.error_rate <= self.max_error_rate:
+            return True
+        return now - stats.last_failure_at >= self.cooldown_seconds
+
+    def ranked_providers(self) -> List[LLMProvider]:
+        """Available providers, fastest healthy first and unhealthy last."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [p for p in self.providers if p.is_available]
+            healthy = [p for p in candidates if self._is_healthy(p, now)]
+            unhealthy = [p for p in candidates if p not in healthy]
+
+            # Unmeasured providers sort first so they get probed once
+            def latency(p):
+                value = self.stats[id(p)].latency
+                return 0.0 if value is None else value
+
+            healthy.sort(key=latency)
+            unhealthy.sort(key=lambda p: self.stats[id(p)].error_rate)
+
+        if len(healthy) > 1 and random.random() < self.explore_rate:
+            probe = healthy.pop(random.randrange(1, len(healthy)))
+            healthy.insert(0, probe)
+        return healthy + unhealthy
+
+    def _record(self, provider: LLMProvider, started: float, error: Optional[Exception] = None):
+        with self._lock:
+            stats = self.stats[id(provider)]
+            if error is None:
+                stats.record_success(time.monotonic() - started)
+            else:
+                stats.record_failure(error)
+
+    def chat(self, messages: List[Dict], **params) -> str:
+        errors = []
+        # A per-call timeout bounds the whole call, fallbacks included
+        deadline = time.monotonic() + params["timeout"] if "timeout" in params else None
+        for provider in self.ranked_providers():
+            started = time.monotonic()
+            if deadline is not None:
+                if started >= deadline:
+                    errors.append("time limit reached")
+                    break
+                params["timeout"] = deadline - started
+            try:
+                result = provider.chat(messages, **params)
+            except Exception as e:
+                self._record(provider, started, e)
+                errors.append(f"{provider.describe()}: {e}")
+                continue
+            self._record(provider, started)
+            return result
+        raise LLMProviderError("All LLM providers failed: " + " | ".join(errors or ["none available"]))
+
+    def stream_chat(self, messages: List[Dict], **params) -> Iterator[str]:
+        # A provider can only be swapped out before its first delta has been
+        # yielded; after that, a failure propagates to the caller.
+        errors = []
+        for provider in self.ranked_providers():
+            started = time.monotonic()
+            stream = provider.stream_chat(messages, **params)
+            try:
+                first = next(stream, None)
+            except Exception as e:
+                self._record(provider, started, e)
+                errors.append(f"{provider.describe()}: {e}")
+                continue
+            try:
+                if first is not None:
+                    yield first
+                yield from stream
+            except Exception as e:
+                self._record(provider, started, e)
+                raise
+            self._record(provider, started)
+            return
+        raise LLMProviderError("All LLM providers failed: " + " | ".join(errors or ["none available"]))
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        # Vectors from different models aren't comparable, so embeddings
+        # always come from the first provider that can produce them. They
+        # are also kept out of the latency stats, which track chat calls.
+        for provider in self.providers:
+            if provider.embedding_model and provider.is_available:
+                return provider.embed(texts)
+        raise LLMProviderError("No embedding-capable provider available")
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-provider routing statistics, keyed by provider label."""
+        with self._lock:
+            return {p.describe(): self.stats[id(p)].to_dict() for p in self.providers}
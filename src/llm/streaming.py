@@ -0,0 +1,122 @@
+"""
+Incremental parsing of streamed LLM output.
+
+Models answer with a JSON object ({"action": "...", ...}) but tokens arrive a
+few characters at a time. IncrementalJSONFieldParser follows the top-level
+string fields of that object as they grow, so partial text can be shown
+before the object is complete. The final parse still goes through json.loads.
+"""
+from typing import Dict, List, Optional, Tuple
+
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f',
+            'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class IncrementalJSONFieldParser:
+    """Tracks top-level string values of a JSON object fed in chunks."""
+
+    def __init__(self):
+        self.fields: Dict[str, str] = {}
+        self.completed: List[str] = []
+        self._state = "preamble"  # preamble, object, key, colon, value, string, other, done
+        self._depth = 0
+        self._key: List[str] = []
+        self._current_key = ""
+        self._value: List[str] = []
+        self._escape: Optional[str] = None  # None, "" after backslash, or \\u hex digits
+        self._other_in_string = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """
+        Consume a chunk of model output.
+
+        Returns:
+            [(field, text_so_far)] for every string field that grew
+        """
+        grown = {}
+        for ch in chunk:
+            if self._state == "string":
+                if self._consume_string_char(ch, self._value):
+                    self.fields[self._current_key] = "".join(self._value)
+                    grown[self._current_key] = True
+                if self._state == "object":
+                    self.completed.append(self._current_key)
+            elif self._state == "key":
+                self._consume_string_char(ch, self._key)
+                if self._state == "object":
+                    self._current_key = "".join(self._key)
+                    self._state = "colon"
+            elif self._state == "preamble":
+                if ch == "{":
+                    self._state = "object"
+                    self._depth = 1
+            elif self._state == "object":
+                if ch == '"':
+                    self._key = []
+                    self._state = "key"
+                elif ch == "}":
+                    self._state = "done"
+            elif self._state == "colon":
+                if ch == ":":
+                    self._state = "value"
+            elif self._state == "value":
+                if ch == '"':
+                    self._value = []
+                    self.fields[self._current_key] = ""
+                    self._state = "string"
+                elif not ch.isspace():
+                    self._depth = 1
+                    self._other_in_string = False
+                    self._state = "other"
+                    self._consume_other_char(ch)
+            elif self._state == "other":
+                self._consume_other_char(ch)
+        return [(key, self.fields[key]) for key in grown]
+
+    def _consume_string_char(self, ch: str, out: List[str]) -> bool:
+        """Handle one char inside a string. Returns True if `out` grew."""
+        if self._escape is not None:
+            if self._escape == "" and ch != "u":
+                out.append(_ESCAPES.get(ch, ch))
+                self._escape = None
+                return True
+            self._escape += ch
+            if len(self._escape) == 5:  # "u" + 4 hex digits
+                try:
+                    out.append(chr(int(self._escape[1:], 16)))
+                except ValueError:
+                    pass
+                self._escape = None
+                return True
+            return False
+        if ch == "\\":
+            self._escape = ""
+            return False
+        if ch == '"':
+            self._state = "object"
+            return False
+        out.append(ch)
+        return True
+
+    def _consume_other_char(self, ch: str):
+        """Skip a non-string value (number, bool, nested object/array)."""
+        if self._other_in_string:
+            if self._escape is not None:
+                self._escape = None
+            elif ch == "\\":
+                self._escape = ""
+            elif ch == '"':
+                self._other_in_string = False
+            return
+        if ch == '"':
+            self._other_in_string = True
+        elif ch in "{[":
+            self._depth += 1
+        elif ch in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                # The brace closed the enclosing object itself
+                self._state = "done"
+        elif ch == "," and self._depth == 1:
+            self._state = "object"
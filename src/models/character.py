@@ -1,11 +1,21 @@
 """
 Character data models for the autonomous world system.
 """
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from itertools import islice
+from typing import Deque, List, Dict, Optional, Tuple
 from enum import Enum
 from datetime import datetime
 import json
+import sys
+import weakref
+
+from src.models.lazy_fields import lazy_field
+from src.models.memory_journal import MemoryJournal
+from src.models.memory_store import MemoryStream, TieredMemoryStore
+from src.utils.bm25 import BM25Index
+from src.utils.text_sketch import SketchIndex, sketch_features
 
 
 class EmotionalState(Enum):
@@ -21,19 +31,100 @@ class EmotionalState(Enum):
     RESTLESS = "restless"
 
 
-@dataclass
+class MemoryRecord:
+    """
+    What happened, shared by every character who remembers it.
+
+    A crowded scene produces one record; each character present keeps a
+    small Memory pointing at it. Records with an id are interned, so
+    memories reloaded from disk share them again.
+    """
+    __slots__ = ("record_id", "timestamp", "content", "location", "participants", "_sketch",
+                 "__weakref__")
+    _shared: "weakref.WeakValueDictionary[int, MemoryRecord]" = weakref.WeakValueDictionary()
+    
+    def __init__(self, record_id: Optional[int], timestamp: datetime, content: str,
+                 location: str, participants: Tuple[str, ...] = ()):
+        self.record_id = record_id  # interaction id, None for standalone memories
+        self.timestamp = timestamp
+        self.content = content
+        self.location = sys.intern(location)
+        self.participants = tuple(sys.intern(p) for p in participants)
+        self._sketch = None
+    
+    @property
+    def sketch(self):
+        """Sparse text sketch of the content, computed once for everyone who remembers it."""
+        if self._sketch is None:
+            self._sketch = sketch_features(self.content)
+        return self._sketch
+    
+    @classmethod
+    def shared(cls, record_id: int, timestamp: datetime, content: str, location: str,
+               participants: Tuple[str, ...] = ()) -> 'MemoryRecord':
+        """The interned record for an interaction id, created on first use."""
+        record = cls._shared.get(record_id)
+        # Ids restart with the process, so a stale id from disk may not match
+        if record is None or record.content != content or record.timestamp != timestamp:
+            record = cls(record_id, timestamp, content, location, participants)
+            cls._shared[record_id] = record
+        return record
+
+
 class Memory:
     """A memory stored by a character."""
-    timestamp: datetime
-    memory_type: str  # "observation", "interaction", "dialogue", "event"
-    content: str  # What happened/was said
-    location: str  # Where it happened
-    other_characters: List[str] = field(default_factory=list)  # Who was involved
-    importance: float = 5.0  # 0-10, how significant
-    emotional_impact: float = 0.0  # -1 to 1, emotional charge
+    
+    __slots__ = ("record", "owner_id", "memory_type", "importance", "emotional_impact")
+    
+    def __init__(
+        self,
+        timestamp: Optional[datetime] = None,
+        memory_type: str = "observation",  # "observation", "interaction", "dialogue", "event", "summary"
+        content: str = "",  # What happened/was said
+        location: str = "",  # Where it happened
+        other_characters: Optional[List[str]] = None,  # Who was involved
+        importance: float = 5.0,  # 0-10, how significant
+        emotional_impact: float = 0.0,  # -1 to 1, emotional charge
+        record: Optional[MemoryRecord] = None,
+        owner_id: Optional[str] = None
+    ):
+        """
+        Either pass the event fields (a private record is created), or a
+        shared `record` plus the id of the character who owns this memory.
+        """
+        if record is None:
+            record = MemoryRecord(None, timestamp, content, location, tuple(other_characters or ()))
+        self.record = record
+        self.owner_id = sys.intern(owner_id) if owner_id else None
+        self.memory_type = sys.intern(memory_type)
+        self.importance = importance
+        self.emotional_impact = emotional_impact
+    
+    @property
+    def timestamp(self) -> datetime:
+        return self.record.timestamp
+    
+    @property
+    def content(self) -> str:
+        return self.record.content
+    
+    @property
+    def location(self) -> str:
+        return self.record.location
+    
+    @property
+    def other_characters(self) -> List[str]:
+        """Everyone involved except the owner."""
+        return [p for p in self.record.participants if p != self.owner_id]
+    
+    def __repr__(self) -> str:
+        return (f"Memory(timestamp={self.timestamp!r}, memory_type={self.memory_type!r}, "
+                f"content={self.content!r}, location={self.location!r}, "
+                f"other_characters={self.other_characters!r}, importance={self.importance!r}, "
+                f"emotional_impact={self.emotional_impact!r})")
     
     def to_dict(self) -> Dict:
-        return {
+        data = {
             "timestamp": self.timestamp.isoformat(),
             "memory_type": self.memory_type,
             "content": self.content,
@@ -42,11 +133,23 @@ class Memory:
             "importance": self.importance,
             "emotional_impact": self.emotional_impact
         }
+        if self.record.record_id is not None:
+            data["record_id"] = self.record.record_id
+            data["owner_id"] = self.owner_id
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'Memory':
         data['timestamp'] = datetime.fromisoformat(data['timestamp'])
-        return cls(**data)
+        record_id = data.pop("record_id", None)
+        owner_id = data.pop("owner_id", None)
+        if record_id is None:
+            return cls(**data)
+        participants = tuple(data["other_characters"]) + ((owner_id,) if owner_id else ())
+        record = MemoryRecord.shared(record_id, data["timestamp"], data["content"],
+                                     data["location"], participants)
+        return cls(memory_type=data["memory_type"], importance=data["importance"],
+                   emotional_impact=data["emotional_impact"], record=record, owner_id=owner_id)
     
     def to_summary(self) -> str:
         """Short summary for context."""
@@ -78,6 +181,29 @@ class Animal:
     @classmethod
     def from_dict(cls, data: Dict) -> 'Animal':
         return cls(**data)
+    
+    def update_definition(self, other: 'Animal'):
+        """Take another animal's authored fields, keeping the current behavior state."""
+        for name in ANIMAL_STATIC_FIELDS:
+            setattr(self, name, getattr(other, name))
+
+
+ANIMAL_STATIC_FIELDS = ("species", "name", "description", "externalized_impulse", "temperament")
+
+
+def _latest(memories: Optional[Deque[Memory]], limit: int) -> List[Memory]:
+    """Last `limit` memories of a chronological deque, oldest first."""
+    if not memories or limit <= 0:
+        return []
+    return list(islice(reversed(memories), limit))[::-1]
+
+
+def _insert_chronological(memories: Deque[Memory], memory: Memory):
+    """Insert keeping timestamp order (an append for anything new)."""
+    position = len(memories)
+    while position > 0 and memories[position - 1].timestamp > memory.timestamp:
+        position -= 1
+    memories.insert(position, memory)
 
 
 @dataclass
@@ -97,8 +223,21 @@ class Character:
     current_location: Optional[str] = None
     emotional_intensity: float = 0.5  # 0.0 to 1.0
     
-    # Memory system
+    # Memory system (memory_stream mirrors the hot and warm tiers, oldest first)
     memory_stream: List[Memory] = field(default_factory=list)
+    memory_store: TieredMemoryStore = field(default_factory=TieredMemoryStore, repr=False, compare=False)
+    memory_sketches: SketchIndex = field(default_factory=SketchIndex, repr=False, compare=False)
+    memory_terms: BM25Index = field(default_factory=BM25Index, repr=False, compare=False)
+    # Chronological memory references per other character / location
+    memories_by_partner: Dict[str, Deque[Memory]] = field(default_factory=dict, repr=False, compare=False)
+    memories_by_location: Dict[str, Deque[Memory]] = field(default_factory=dict, repr=False, compare=False)
+    # Where memories persist; replayed on first access to any memory (see _load_memories)
+    memory_journal: Optional[MemoryJournal] = field(default=None, repr=False, compare=False)
+    
+    def __post_init__(self):
+        memories, self._memory_stream = self._memory_stream, MemoryStream()
+        for memory in memories:
+            self.add_memory(memory)
     
     def to_dict(self) -> Dict:
         return {
@@ -117,25 +256,61 @@ class Character:
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'Character':
-        animal_data = data.pop("animal_companion")
+        data["id"] = sys.intern(data["id"])
+        animal = data.pop("animal_companion")
         emotional_state = EmotionalState(data.pop("emotional_state", "calm"))
         return cls(
-            animal_companion=Animal.from_dict(animal_data),
+            # A compiled world bundle passes a loader instead of the dict
+            animal_companion=Animal.from_dict(animal) if isinstance(animal, dict) else animal,
             emotional_state=emotional_state,
             **data
         )
     
-    def save_to_file(self, filepath: str):
-        """Save character to JSON file."""
+    def update_definition(self, other: 'Character'):
+        """
+        Take the authored fields of a freshly loaded copy (hot reload).
+        
+        Dynamic state (location, emotional state, memories, the companion's
+        behavior state) is kept.
+        """
+        for name in CHARACTER_STATIC_FIELDS:
+            setattr(self, name, getattr(other, name))
+        self.animal_companion.update_definition(other.animal_companion)
+    
+    def save_to_file(self, filepath: str, journal_dir: Optional[str] = None):
+        """
+        Save character to JSON file.
+        
+        Memories are not part of the JSON; with `journal_dir` they are written
+        to the character's memory journal there, which then records every
+        later memory as it is added.
+        """
         with open(filepath, 'w') as f:
             json.dump(self.to_dict(), f, indent=2)
+        if journal_dir:
+            self.persist_memories(journal_dir)
     
     @classmethod
-    def load_from_file(cls, filepath: str) -> 'Character':
-        """Load character from JSON file."""
+    def load_from_file(cls, filepath: str, journal_dir: Optional[str] = None) -> 'Character':
+        """Load character from JSON file (memories from `journal_dir`, lazily)."""
         with open(filepath, 'r') as f:
             data = json.load(f)
-        return cls.from_dict(data)
+        char = cls.from_dict(data)
+        if journal_dir:
+            char.attach_memory_journal(journal_dir)
+        return char
+    
+    def attach_memory_journal(self, journal_dir: str):
+        """Persist memories in `journal_dir`; existing ones are read on first use."""
+        self.memory_journal = MemoryJournal.for_character(journal_dir, self.id)
+    
+    def persist_memories(self, journal_dir: str):
+        """Write current memories to a journal in `journal_dir` and keep it updated."""
+        self._load_memories()
+        journal = MemoryJournal.for_character(journal_dir, self.id)
+        journal.rewrite(self.memory_stream)
+        journal.loaded = True
+        self.memory_journal = journal
     
     def shift_emotional_state(self, new_state: EmotionalState, intensity_delta: float = 0.0):
         """Shift character's emotional state."""
@@ -152,73 +327,201 @@ class Character:
     def add_memory(self, memory: Memory):
         """Add a memory to the character's memory stream."""
         self.memory_stream.append(memory)
-        
-        # Prune old low-importance memories if too many
-        if len(self.memory_stream) > 50:
-            self._prune_memories()
-    
-    def _prune_memories(self):
-        """Keep only recent or important memories."""
-        # Keep last 20 memories regardless of importance
-        recent = self.memory_stream[-20:]
-        
-        # Keep high-importance memories from before
-        important = [m for m in self.memory_stream[:-20] if m.importance >= 7.0]
-        
-        # Combine
-        self.memory_stream = important + recent
+        self._index_memory(memory)
+        journal = self.memory_journal
+        if journal is not None and not journal.replaying:
+            journal.append(memory)
+        self._forget(self.memory_store.add(memory))
+        if journal is not None and not journal.replaying:
+            journal.maybe_compact(self.memory_stream)
+    
+    def _load_memories(self):
+        """Replay the memory journal the first time memories are needed."""
+        journal = self.memory_journal
+        if journal is None or journal.loaded:
+            return
+        journal.loaded = True
+        journal.replaying = True
+        # Replayed evictions were archived when they first happened
+        archive_path, self.memory_store.archive_path = self.memory_store.archive_path, None
+        try:
+            by_seq: Dict[int, Memory] = {}
+            for seq, memory, replaces in journal.replay():
+                members = []
+                if replaces:
+                    live = {id(m) for m in self._memory_stream}
+                    members = [by_seq[s] for s in replaces if s in by_seq and id(by_seq[s]) in live]
+                if members:
+                    self.replace_memories(members, memory)
+                else:
+                    self.add_memory(memory)
+                by_seq[seq] = memory
+                journal.track(memory, seq)
+            live = {id(m) for m in self._memory_stream}
+            journal.forget([m for m in by_seq.values() if id(m) not in live])
+        finally:
+            self.memory_store.archive_path = archive_path
+            journal.replaying = False
+    
+    def configure_memory(self, hot_capacity: int, warm_capacity: int,
+                         archive_path: Optional[str] = None):
+        """Set tier capacities (and where evicted memories are archived)."""
+        self._forget(self.memory_store.configure(hot_capacity, warm_capacity, archive_path))
+    
+    def replace_memories(self, members: List[Memory], summary: Memory):
+        """Replace a group of memories with one summary (used by consolidation)."""
+        member_ids = {id(m) for m in members}
+        # The summary takes the stream position of the newest member
+        newest = max(i for i, m in enumerate(self.memory_stream) if id(m) in member_ids)
+        stream = MemoryStream()
+        for i, memory in enumerate(self.memory_stream):
+            if i == newest:
+                stream.append(summary)
+            elif id(memory) not in member_ids:
+                stream.append(memory)
+        self.memory_stream = stream
+        self._unindex_memories(members)
+        self._index_memory(summary)
+        journal = self.memory_journal
+        if journal is not None and not journal.replaying:
+            journal.append(summary, replaces=members)
+            journal.forget(members)
+        self._forget(self.memory_store.replace(members, summary))
+    
+    def _forget(self, evicted: List[Memory]):
+        """Remove memories the store evicted from the stream and indexes."""
+        if not evicted:
+            return
+        stream = self.memory_stream
+        for memory in evicted:
+            stream.remove(memory)
+        self._unindex_memories(evicted)
+        if self.memory_journal is not None and not self.memory_journal.replaying:
+            self.memory_journal.forget(evicted)
+    
+    def _index_memory(self, memory: Memory):
+        """Add a memory to every search/lookup index."""
+        self.memory_sketches.add(memory)
+        self.memory_terms.add(memory)
+        for character_id in memory.other_characters:
+            _insert_chronological(self.memories_by_partner.setdefault(character_id, deque()), memory)
+        _insert_chronological(self.memories_by_location.setdefault(memory.location, deque()), memory)
+    
+    def _unindex_memories(self, removed: List[Memory]):
+        """Drop memories (by identity) from every search/lookup index."""
+        if not removed:
+            return
+        removed_ids = {id(m) for m in removed}
+        partners = set()
+        locations = set()
+        for memory in removed:
+            self.memory_sketches.remove(memory)
+            self.memory_terms.remove(memory)
+            partners.update(memory.other_characters)
+            locations.add(memory.location)
+        for index, keys in ((self.memories_by_partner, partners),
+                            (self.memories_by_location, locations)):
+            for key in keys:
+                kept = deque(m for m in index.get(key, ()) if id(m) not in removed_ids)
+                if kept:
+                    index[key] = kept
+                else:
+                    index.pop(key, None)
     
     def get_recent_memories(self, count: int = 5) -> List[Memory]:
         """Get most recent memories."""
-        return self.memory_stream[-count:] if self.memory_stream else []
+        return self.memory_stream.recent(count)
     
     def get_memories_about(self, character_id: str, limit: int = 3) -> List[Memory]:
         """Get memories involving another specific character."""
-        relevant = [m for m in self.memory_stream 
-                   if character_id in m.other_characters]
-        return relevant[-limit:] if relevant else []
+        self._load_memories()
+        return _latest(self.memories_by_partner.get(character_id), limit)
     
     def get_memories_at_location(self, location_id: str, limit: int = 3) -> List[Memory]:
         """Get memories from a specific location."""
-        relevant = [m for m in self.memory_stream 
-                   if m.location == location_id]
-        return relevant[-limit:] if relevant else []
+        self._load_memories()
+        return _latest(self.memories_by_location.get(location_id), limit)
     
     def has_met_before(self, character_id: str) -> bool:
         """Check if this character has met another before."""
-        return any(character_id in m.other_characters for m in self.memory_stream)
+        self._load_memories()
+        return character_id in self.memories_by_partner
 
-    def search_memories(self, query: str, limit: int = 5, use_embeddings: bool = False) -> List[Memory]:
+    def search_memories(self, query: str, limit: int = 5, use_embeddings: bool = False,
+                        include_archive: bool = False,
+                        now: Optional[datetime] = None,
+                        priority=None, offline: bool = False) -> List[Memory]:
         """
         Search memories semantically (if embeddings enabled) or by keywords.
 
+        Without an embedding provider, semantic search uses the hashed
+        TF-IDF sketches computed as each memory was added.
+
         Args:
             query: What to search for (e.g., "times when I felt uncertain")
             limit: How many memories to return
-            use_embeddings: Use semantic search (requires API key)
+            use_embeddings: Use semantic search (embeddings, or sketches offline)
+            include_archive: Also keyword-search archived (cold) memories;
+                archive hits are ranked after in-memory matches
+            now: Current simulated time for recency decay in semantic search
+                (default: the newest memory's time)
+            priority: LLM gateway class for embedding calls (src.llm.gateway.Priority;
+                default INTERACTIVE, as searches run inside ticks)
+            offline: With use_embeddings, rank with the text sketches even
+                when an embedding provider is configured (no network calls)
 
         Returns:
             List of relevant memories
         """
+        self._load_memories()
+        if include_archive:
+            if use_embeddings:
+                results = self.search_memories(query, limit, use_embeddings=True, now=now,
+                                               priority=priority, offline=offline)
+            else:
+                results = self.memory_terms.search(query, limit, pad=False)
+            archived = self.memory_store.search_archive(query, limit)
+            return (results + archived)[:limit]
+
         if not self.memory_stream:
             return []
 
+        if use_embeddings and offline:
+            return self.memory_sketches.search(query, limit, now)
         if use_embeddings:
             try:
-                from src.utils.memory_search import MemorySearchEngine
-                search_engine = MemorySearchEngine(use_embeddings=True)
-                return search_engine.search_relevant_memories(self.memory_stream, query, limit)
+                from src.utils.memory_search import get_memory_search_engine
+                search_engine = get_memory_search_engine()
+                return search_engine.search_relevant_memories(self.memory_stream, query, limit,
+                                                            owner_id=self.id,
+                                                            sketches=self.memory_sketches,
+                                                            now=now, priority=priority)
             except Exception as e:
                 print(f"Semantic search failed: {e}. Using chronological fallback.")
                 return self.get_recent_memories(limit)
         else:
-            # Simple keyword matching fallback
-            query_words = set(query.lower().split())
-            scored = []
-            for mem in self.memory_stream:
-                mem_words = set(mem.content.lower().split())
-                matches = len(query_words.intersection(mem_words))
-                scored.append((matches, mem))
-            scored.sort(reverse=True, key=lambda x: x[0])
-            return [mem for _, mem in scored[:limit]]
+            # Keyword search (BM25 over the incrementally maintained index)
+            return self.memory_terms.search(query, limit)
+
+
+# Fields authored in data/characters (everything else is simulation state)
+CHARACTER_STATIC_FIELDS = ("name", "archetype", "physical_description", "backstory",
+                           "motivational_drivers", "relationships")
+
+
+def _get_memory_stream(self: Character) -> List[Memory]:
+    self._load_memories()
+    return self._memory_stream
+
+
+def _set_memory_stream(self: Character, memories: List[Memory]):
+    self._memory_stream = memories if isinstance(memories, MemoryStream) else MemoryStream(memories)
+
 
+# Installed after @dataclass so the field keeps its constructor argument and
+# default, while any read of memory_stream triggers the lazy journal replay
+Character.memory_stream = property(_get_memory_stream, _set_memory_stream)
+# Bulky static fields may stay in a compiled world bundle until first read
+for _name in ("physical_description", "backstory", "motivational_drivers", "relationships",
+              "animal_companion"):
+    setattr(Character, _name, lazy_field(_name))
@@ -5,6 +5,9 @@ from dataclasses import dataclass, field
 from typing import List, Optional
 from enum import Enum
 from datetime import datetime
+import itertools
+import json
+import sys
 
 
 class InteractionType(Enum):
@@ -31,7 +34,26 @@ class EmotionalTemperature(Enum):
     RUPTURED = "ruptured"
 
 
-@dataclass
+_interaction_ids = itertools.count(1)
+
+# Template-generated text repeats a lot, so the template path shares one
+# copy of each string. LLM text is unique and never pooled: a pool that
+# kept it would grow for the life of the process, like sys.intern.
+_TEXT_POOL_LIMIT = 100_000
+_text_pool: dict = {}
+
+
+def pooled_text(text: str) -> str:
+    """One shared copy of a repeated template string (until the pool fills up)."""
+    shared = _text_pool.get(text)
+    if shared is not None:
+        return shared
+    if len(_text_pool) < _TEXT_POOL_LIMIT:
+        _text_pool[text] = text
+    return text
+
+
+@dataclass(slots=True)
 class Interaction:
     """A single interaction event in the simulation."""
     timestamp: datetime
@@ -58,8 +80,40 @@ class Interaction:
     is_unexpected: bool = False
     pattern_tags: List[str] = field(default_factory=list)
     
+    # Process-unique id; memories of this interaction share a record by it
+    interaction_id: int = field(default_factory=lambda: next(_interaction_ids))
+    # World change sequence number, assigned when logged (0 = not logged yet)
+    seq: int = 0
+    
+    # Serializations, built on first use and cleared when a field is assigned.
+    # Lists are not watched: replace pattern_tags rather than appending to it.
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _field_note: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name not in _CACHE_SLOTS:
+            object.__setattr__(self, "_json", None)
+            object.__setattr__(self, "_field_note", None)
+    
+    def __post_init__(self):
+        # Ids and environment strings come from a small vocabulary but are
+        # rebuilt every tick; interning stores each distinct value once
+        self.location_id = sys.intern(self.location_id)
+        self.location_name = sys.intern(self.location_name)
+        self.characters_present = [sys.intern(c) for c in self.characters_present]
+        self.animals_present = [sys.intern(a) for a in self.animals_present]
+        self.time_of_day = sys.intern(self.time_of_day)
+        self.weather = sys.intern(self.weather)
+        self.environmental_context = sys.intern(self.environmental_context)
+    
     def to_field_note(self) -> str:
         """Format interaction as a field note."""
+        if self._field_note is None:
+            self._field_note = self._render_field_note()
+        return self._field_note
+    
+    def _render_field_note(self) -> str:
         time_str = self.timestamp.strftime("%H:%M")
 
         note = f"[{time_str} - {self.location_name} - {self.time_of_day.title()}]\n"
@@ -79,9 +133,17 @@ class Interaction:
 
         return note
     
+    def to_json(self) -> bytes:
+        """to_dict() as compact JSON (UTF-8), encoded once per version of the record."""
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), separators=(",", ":")).encode("utf-8")
+        return self._json
+    
     def to_dict(self) -> dict:
         """Convert to dictionary for storage."""
         return {
+            "interaction_id": self.interaction_id,
+            "seq": self.seq,
             "timestamp": self.timestamp.isoformat(),
             "location_id": self.location_id,
             "location_name": self.location_name,
@@ -100,3 +162,6 @@ class Interaction:
         }
 
 
+
+
+_CACHE_SLOTS = frozenset({"_json", "_field_note"})
@@ -0,0 +1,304 @@
+"""
+SQLite-backed interaction store.
+
+Every logged interaction is also written to a local SQLite database so that
+the UI and exporters can ask targeted questions ("tense scenes at the
+courtyard with Parade") without scanning the in-memory log:
+
+- WAL journal mode, so reads never block the simulation's writes.
+- Inserts are buffered and written in batches (one transaction per batch);
+  any query flushes the buffer first, so reads always see every interaction.
+- Indexed columns: timestamp, location, emotional temperature, and a
+  character -> interaction table; the full interaction is kept as JSON.
+- Results are newest first with cursor pagination on the store's own
+  sequence number, which (unlike interaction ids) is stable across restarts.
+- A full-text index (SQLite FTS5, porter-stemmed) over each interaction's
+  action description, material details and cinematic report is kept in
+  step with every batch, for ranked phrase search with snippets. Builds of
+  SQLite without FTS5 fall back to an unranked substring scan.
+"""
+import atexit
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.config_loader import ConfigLoader
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    world_id TEXT NOT NULL,
+    interaction_id INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    location_id TEXT NOT NULL,
+    interaction_type TEXT NOT NULL,
+    emotional_temperature TEXT NOT NULL,
+    is_unexpected INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS interaction_characters (
+    character_id TEXT NOT NULL,
+    seq INTEGER NOT NULL REFERENCES interactions(seq),
+    PRIMARY KEY (character_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_interactions_timestamp ON interactions(world_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_interactions_location ON interactions(world_id, location_id, seq);
+CREATE INDEX IF NOT EXISTS idx_interactions_temperature
+    ON interactions(world_id, emotional_temperature, seq);
+"""
+
+# rowid = interactions.seq
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS interactions_fts USING fts5(
+    action_description, material_details, cinematic_report,
+    tokenize = 'porter unicode61'
+)
+"""
+FTS_FIELDS = ("action_description", "material_details", "cinematic_report")
+
+_PHRASE_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def fts_query(text: str) -> str:
+    """
+    User search text as an FTS5 query: "quoted phrases" stay phrases, other
+    words must all appear. Everything is quoted, so FTS operators and
+    punctuation in the input can't cause syntax errors.
+    """
+    terms = []
+    for phrase, word in _PHRASE_RE.findall(text):
+        term = (phrase or word).strip()
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"')
+    return " ".join(terms)
+
+
+class InteractionStore:
+    """Thread-safe, batched SQLite store of interactions."""
+
+    def __init__(self, path: str = ":memory:", batch_size: int = 50):
+        """
+        Args:
+            path: Database file (":memory:" for a throwaway store)
+            batch_size: Buffered interactions written per transaction
+        """
+        self.path = path
+        self.batch_size = batch_size
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self.full_text = self._create_fts()
+        self._pending: List[Tuple[str, object]] = []  # (world_id, interaction)
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def _create_fts(self) -> bool:
+        """Create (and backfill) the full-text index; False if FTS5 is unavailable."""
+        try:
+            with self._conn:
+                existed = self._conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'interactions_fts'").fetchone()
+                self._conn.execute(FTS_SCHEMA)
+                if not existed:
+                    # Index interactions stored before full-text search existed
+                    self._conn.execute(
+                        "INSERT INTO interactions_fts (rowid, action_description, material_details, "
+                        "cinematic_report) SELECT seq, json_extract(data, '$.action_description'), "
+                        "json_extract(data, '$.material_details'), "
+                        "json_extract(data, '$.cinematic_report') FROM interactions")
+        except sqlite3.OperationalError as e:
+            print(f"SQLite full-text search unavailable: {e}. Using substring search.")
+            return False
+        return True
+
+    def add(self, world_id: str, interaction):
+        """Buffer an interaction; written once the batch fills (or on flush/query)."""
+        with self._lock:
+            self._pending.append((world_id, interaction))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        """Write any buffered interactions."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        with self._conn:  # One transaction per batch
+            for world_id, interaction in pending:
+                cursor = self._conn.execute(
+                    "INSERT INTO interactions (world_id, interaction_id, timestamp, location_id, "
+                    "interaction_type, emotional_temperature, is_unexpected, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (world_id, interaction.interaction_id, interaction.timestamp.isoformat(),
+                     interaction.location_id, interaction.interaction_type.value,
+                     interaction.emotional_temperature.value, int(interaction.is_unexpected),
+                     interaction.to_json().decode('utf-8')))
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO interaction_characters (character_id, seq) VALUES (?, ?)",
+                    [(character_id, cursor.lastrowid)
+                     for character_id in interaction.characters_present])
+                if self.full_text:
+                    self._conn.execute(
+                        "INSERT INTO interactions_fts (rowid, action_description, material_details, "
+                        "cinematic_report) VALUES (?, ?, ?, ?)",
+                        (cursor.lastrowid, interaction.action_description,
+                         interaction.material_details, interaction.cinematic_report))
+
+    def query(self, world_id: Optional[str] = None, location_id: Optional[str] = None,
+              characters: Optional[List[str]] = None, temperature: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None,
+              unexpected: Optional[bool] = None, cursor: Optional[int] = None,
+              limit: int = 50) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Interactions matching every given filter, newest first.
+
+        Args:
+            world_id: Only this world's interactions (None = every world in the store)
+            location_id: Where it happened
+            characters: Character ids that must all have been present
+            temperature: Emotional temperature value ("tense", ...)
+            since / until: ISO timestamps bounding simulated time (inclusive)
+            unexpected: Only emergent (True) or ordinary (False) interactions
+            cursor: `next_cursor` from the previous page
+            limit: Page size
+
+        Returns:
+            (interaction dicts, next_cursor or None when there are no more)
+        """
+        clauses, params = [], []
+        for column, value in (("world_id", world_id), ("location_id", location_id),
+                              ("emotional_temperature", temperature)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp <= ?")
+            params.append(until)
+        if unexpected is not None:
+            clauses.append("is_unexpected = ?")
+            params.append(int(unexpected))
+        for character_id in characters or ():
+            clauses.append("seq IN (SELECT seq FROM interaction_characters WHERE character_id = ?)")
+            params.append(character_id)
+        if cursor is not None:
+            clauses.append("seq < ?")
+            params.append(cursor)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT seq, data FROM interactions {where} ORDER BY seq DESC LIMIT ?"
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(sql, params + [limit + 1]).fetchall()
+
+        more = len(rows) > limit
+        rows = rows[:limit]
+        results = []
+        for seq, data in rows:
+            interaction = json.loads(data)
+            interaction["row_id"] = seq
+            results.append(interaction)
+        next_cursor = rows[-1][0] if more else None
+        return results, next_cursor
+
+    def search(self, text: str, world_id: Optional[str] = None, limit: int = 20,
+               offset: int = 0) -> List[Dict]:
+        """
+        Full-text search over field-note text, best match first.
+
+        Args:
+            text: Words (all must appear) and/or "quoted phrases"
+            world_id: Only this world's interactions (None = every world)
+            limit / offset: Page of ranked results
+
+        Returns:
+            Interaction dicts, each with "row_id", "score" (higher is better)
+            and "snippet" (matched terms in [brackets])
+        """
+        match = fts_query(text)
+        if not match:
+            return []
+        world_clause = "AND i.world_id = ?" if world_id is not None else ""
+        world_params = [world_id] if world_id is not None else []
+
+        with self._lock:
+            self._flush_locked()
+            if self.full_text:
+                rows = self._conn.execute(
+                    "SELECT i.seq, i.data, -bm25(interactions_fts), "
+                    "snippet(interactions_fts, -1, '[', ']', '…', 12) "
+                    "FROM interactions_fts JOIN interactions i ON i.seq = interactions_fts.rowid "
+                    f"WHERE interactions_fts MATCH ? {world_clause} "
+                    "ORDER BY bm25(interactions_fts) LIMIT ? OFFSET ?",
+                    [match] + world_params + [limit, offset]).fetchall()
+            else:
+                rows = self._substring_search(text, world_clause, world_params, limit, offset)
+
+        results = []
+        for seq, data, score, snippet in rows:
+            interaction = json.loads(data)
+            interaction.update(row_id=seq, score=round(score, 4), snippet=snippet)
+            results.append(interaction)
+        return results
+
+    def _substring_search(self, text: str, world_clause: str, world_params: List,
+                          limit: int, offset: int) -> List[Tuple]:
+        """Newest interactions containing every term (no FTS5; lock held)."""
+        terms = [phrase or word for phrase, word in _PHRASE_RE.findall(text)]
+        searchable = " || ' ' || ".join(f"json_extract(i.data, '$.{name}')" for name in FTS_FIELDS)
+        clauses = " AND ".join(f"instr(lower({searchable}), ?) > 0" for _ in terms)
+        rows = self._conn.execute(
+            f"SELECT i.seq, i.data FROM interactions i WHERE {clauses} {world_clause} "
+            "ORDER BY i.seq DESC LIMIT ? OFFSET ?",
+            [term.lower() for term in terms] + world_params + [limit, offset]).fetchall()
+        results = []
+        for seq, data in rows:
+            note = json.loads(data)["action_description"]
+            position = note.lower().find(terms[0].lower())
+            start = max(0, position - 60) if position >= 0 else 0
+            results.append((seq, data, 0.0, note[start:start + 160]))
+        return results
+
+    def count(self, world_id: Optional[str] = None) -> int:
+        with self._lock:
+            self._flush_locked()
+            if world_id is None:
+                return self._conn.execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM interactions WHERE world_id = ?",
+                                      (world_id,)).fetchone()[0]
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+        atexit.unregister(self.flush)
+
+
+_store: Optional[InteractionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_interaction_store(config: Optional[ConfigLoader] = None) -> Optional[InteractionStore]:
+    """Process-wide store at `storage.interactions_db` (None if unset)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            config = config or ConfigLoader()
+            path = config.get("storage.interactions_db")
+            if not path:
+                return None
+            _store = InteractionStore(path, batch_size=config.get("storage.batch_size", 50))
+        return _store
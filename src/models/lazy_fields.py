@@ -0,0 +1,25 @@
+"""
+Fields that can be loaded on first read.
+
+The compiled world bundle leaves bulky static fields (backstories,
+descriptions, driver and object lists) in the bundle file until something
+reads them. Such a field holds a zero-argument loader until then; the
+property swaps in the loaded value on first access.
+"""
+
+
+def lazy_field(name: str) -> property:
+    """Property for a dataclass field that may hold a loader callable."""
+    private = f"_{name}"
+
+    def get(self):
+        value = getattr(self, private)
+        if callable(value):
+            value = value()
+            setattr(self, private, value)
+        return value
+
+    def set(self, value):
+        setattr(self, private, value)
+
+    return property(get, set)
@@ -5,6 +5,9 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 from enum import Enum
 import json
+import sys
+
+from src.models.lazy_fields import lazy_field
 
 
 class TimeOfDay(Enum):
@@ -66,6 +69,7 @@ class Location:
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'Location':
+        data["id"] = sys.intern(data["id"])
         current_time = TimeOfDay(data.pop("current_time", "midday"))
         current_weather = Weather(data.pop("current_weather", "clear"))
         return cls(
@@ -74,6 +78,11 @@ class Location:
             **data
         )
     
+    def update_definition(self, other: 'Location'):
+        """Take the authored fields of a freshly loaded copy, keeping time and weather."""
+        for name in LOCATION_STATIC_FIELDS:
+            setattr(self, name, getattr(other, name))
+    
     def save_to_file(self, filepath: str):
         """Save location to JSON file."""
         with open(filepath, 'w') as f:
@@ -112,3 +121,13 @@ class Location:
         }
         
         return f"{time_descriptions[self.current_time]}, {weather_descriptions[self.current_weather]}"
+
+
+# Fields authored in data/locations (time and weather are simulation state)
+LOCATION_STATIC_FIELDS = ("name", "description", "lighting_quality", "temperature_range",
+                          "acoustic_quality", "objects_present", "architectural_features",
+                          "atmosphere")
+
+# Bulky static fields may stay in a compiled world bundle until first read
+for _name in ("description", "objects_present", "architectural_features"):
+    setattr(Location, _name, lazy_field(_name))
@@ -0,0 +1,111 @@
+"""
+Per-character memory persistence.
+
+Each character's memories live in their own append-only JSONL journal
+(`<journal_dir>/<character_id>.jsonl`), separate from the character file.
+Every new memory is one appended line; a consolidation summary is appended
+with the sequence numbers of the memories it replaced. Replaying the journal
+through the character's tiered store rebuilds the same hot/warm memories.
+
+Journals are read lazily, the first time a character's memories are
+touched, so a world with thousands of characters starts without reading
+any of them. Once a journal is mostly lines for memories that have since
+been evicted or merged, it is rewritten with only the live ones.
+"""
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class MemoryJournal:
+    """Append-only memory log for one character."""
+
+    def __init__(self, path: str, compact_ratio: int = 4, compact_min: int = 256):
+        """
+        Args:
+            path: Journal file (created on first append)
+            compact_ratio: Rewrite once the file holds this many lines per live memory
+            compact_min: ...but never for fewer lines than this
+        """
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self.loaded = False  # Set once the journal has been replayed into the character
+        self.replaying = False
+        self.lines = 0
+        self._next_seq = 0
+        self._seq_of: Dict[int, int] = {}  # id(memory) -> seq of its journal line
+
+    @classmethod
+    def for_character(cls, journal_dir: str, character_id: str) -> 'MemoryJournal':
+        return cls(os.path.join(journal_dir, f"{character_id}.jsonl"))
+
+    def replay(self) -> Iterator[Tuple[int, object, List[int]]]:
+        """(seq, memory, seqs it replaces) for every journal line, oldest first."""
+        from src.models.character import Memory
+        self.lines = 0
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Truncated tail from an interrupted write
+                self.lines += 1
+                seq = entry.pop("seq")
+                replaces = entry.pop("replaces", [])
+                self._next_seq = max(self._next_seq, seq + 1)
+                yield seq, Memory.from_dict(entry), replaces
+
+    def track(self, memory, seq: int):
+        """Remember which journal line a replayed memory came from."""
+        self._seq_of[id(memory)] = seq
+
+    def append(self, memory, replaces: Optional[List] = None):
+        """Journal a new memory (or a summary replacing earlier ones)."""
+        self._write([self._entry(memory, replaces)], "a")
+
+    def forget(self, memories: List):
+        """Stop tracking memories that left the character's in-memory tiers."""
+        for memory in memories:
+            self._seq_of.pop(id(memory), None)
+
+    def maybe_compact(self, live: List):
+        """Rewrite the journal once it is mostly dead lines."""
+        if self.lines > max(self.compact_min, self.compact_ratio * len(live)):
+            self.rewrite(live)
+
+    def rewrite(self, memories: List):
+        """Replace the journal with exactly these memories (oldest first)."""
+        self._seq_of.clear()
+        self.lines = 0
+        self._write([self._entry(memory) for memory in memories], "w")
+
+    def delete(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._seq_of.clear()
+        self.lines = 0
+
+    def _entry(self, memory, replaces: Optional[List] = None) -> Dict:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seq_of[id(memory)] = seq
+        entry = memory.to_dict()
+        entry["seq"] = seq
+        if replaces:
+            entry["replaces"] = [self._seq_of[id(m)] for m in replaces if id(m) in self._seq_of]
+        return entry
+
+    def _write(self, entries: List[Dict], mode: str):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp" if mode == "w" else self.path
+        with open(tmp_path, mode) as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        if mode == "w":
+            os.replace(tmp_path, self.path)
+        self.lines += len(entries)
@@ -0,0 +1,216 @@
+"""
+Tiered storage for a character's memories.
+
+- Hot: the most recent memories, in arrival order (bounded deque).
+- Warm: older memories ordered by importance (bounded min-heap); when it
+  overflows, the least important (oldest first on ties) is evicted.
+- Cold: evicted memories are appended to a per-character JSONL archive,
+  which can still be searched but is never loaded back into memory.
+
+Per-add cost is O(log warm) and in-memory size is bounded by hot + warm,
+while long-lived characters keep their full history on disk. The
+character's chronological view of the same memories (MemoryStream) appends
+and drops evicted memories in O(1) too; only its per-partner and
+per-location lookup lists that held an evicted memory are rebuilt, in time
+proportional to those lists.
+"""
+import heapq
+import itertools
+import json
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.text_sketch import tokenize
+
+
+@dataclass
+class MemoryCapacity:
+    """Per-world tier sizes."""
+    hot: int = 20
+    warm: int = 30
+    archive_dir: Optional[str] = None  # None = evicted memories are dropped
+
+    @classmethod
+    def from_config(cls, config: Optional[ConfigLoader] = None) -> 'MemoryCapacity':
+        config = config or ConfigLoader()
+        return cls(
+            hot=config.get("memory.tiers.hot", 20),
+            warm=config.get("memory.tiers.warm", 30),
+            archive_dir=config.get("memory.tiers.archive_dir")
+        )
+
+    def archive_path(self, world_id: str, character_id: str) -> Optional[str]:
+        if not self.archive_dir:
+            return None
+        return os.path.join(self.archive_dir, world_id, f"{character_id}.jsonl")
+
+
+class MemoryStream:
+    """
+    A character's in-memory memories, oldest first.
+
+    Backed by an insertion-ordered dict keyed by identity, so appending and
+    removing an evicted memory are O(1) wherever it sits. Iteration, len()
+    and recent() read the dict directly; indexing and slicing use a list
+    snapshot that is rebuilt only after the stream changed.
+    """
+
+    __slots__ = ("_items", "_snapshot")
+
+    def __init__(self, memories: Iterable = ()):
+        self._items: Dict[int, object] = {id(m): m for m in memories}
+        self._snapshot: Optional[List] = None
+
+    def append(self, memory):
+        self._items[id(memory)] = memory
+        self._snapshot = None
+
+    def remove(self, memory):
+        """Drop a memory (by identity); a no-op if it is not in the stream."""
+        if self._items.pop(id(memory), None) is not None:
+            self._snapshot = None
+
+    def __contains__(self, memory) -> bool:
+        return id(memory) in self._items
+
+    def recent(self, count: int) -> List:
+        """The newest `count` memories, oldest first, in O(count)."""
+        newest = list(itertools.islice(reversed(self._items.values()), max(count, 0)))
+        newest.reverse()
+        return newest
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._items.values())
+
+    def __reversed__(self) -> Iterator:
+        return reversed(self._items.values())
+
+    def __getitem__(self, index):
+        if self._snapshot is None:
+            self._snapshot = list(self._items.values())
+        return self._snapshot[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, MemoryStream):
+            other = list(other)
+        return list(self) == other
+
+    def __repr__(self) -> str:
+        return f"MemoryStream({list(self)!r})"
+
+
+class TieredMemoryStore:
+    """Hot ring buffer + importance heap + on-disk archive."""
+
+    def __init__(self, hot_capacity: int = 20, warm_capacity: int = 30,
+                 archive_path: Optional[str] = None):
+        self.hot_capacity = hot_capacity
+        self.warm_capacity = warm_capacity
+        self.archive_path = archive_path
+        self.hot: Deque = deque()
+        self.warm: List[Tuple[float, int, object]] = []  # (importance, seq, memory) min-heap
+        self.archived_count = 0
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.hot) + len(self.warm)
+
+    def configure(self, hot_capacity: int, warm_capacity: int,
+                  archive_path: Optional[str] = None) -> List:
+        """Change capacities; returns memories evicted to fit them."""
+        self.hot_capacity = hot_capacity
+        self.warm_capacity = warm_capacity
+        self.archive_path = archive_path
+        return self._rebalance()
+
+    def add(self, memory) -> List:
+        """
+        Store a new memory.
+
+        Returns:
+            Memories that left the in-memory tiers (archived or dropped)
+        """
+        self.hot.append(memory)
+        return self._rebalance()
+
+    def warm_memories(self) -> List:
+        """Memories currently in the warm tier (heap order)."""
+        return [entry[2] for entry in self.warm]
+
+    def replace(self, members: List, summary) -> List:
+        """
+        Swap a group of memories for one summary; the originals are archived.
+
+        Returns:
+            Memories evicted to make room for the summary
+        """
+        member_ids = {id(m) for m in members}
+        self.hot = deque(m for m in self.hot if id(m) not in member_ids)
+        self.warm = [entry for entry in self.warm if id(entry[2]) not in member_ids]
+        heapq.heapify(self.warm)
+        heapq.heappush(self.warm, (summary.importance, next(self._seq), summary))
+        self._archive(members)
+        return self._rebalance()
+
+    def _rebalance(self) -> List:
+        while len(self.hot) > self.hot_capacity:
+            older = self.hot.popleft()
+            heapq.heappush(self.warm, (older.importance, next(self._seq), older))
+        evicted = []
+        while len(self.warm) > self.warm_capacity:
+            evicted.append(heapq.heappop(self.warm)[2])
+        if evicted:
+            self._archive(evicted)
+        return evicted
+
+    def _archive(self, memories: List):
+        if not self.archive_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.archive_path)), exist_ok=True)
+        with open(self.archive_path, "a") as f:
+            for memory in memories:
+                f.write(json.dumps(memory.to_dict()) + "\n")
+        self.archived_count += len(memories)
+
+    def iter_archive(self) -> Iterator:
+        """Archived memories, oldest eviction first."""
+        from src.models.character import Memory
+        if not self.archive_path or not os.path.exists(self.archive_path):
+            return
+        with open(self.archive_path) as f:
+            for line in f:
+                if line.strip():
+                    yield Memory.from_dict(json.loads(line))
+
+    def search_archive(self, query: str, limit: int = 5, k1: float = 1.2) -> List:
+        """
+        Keyword search over the archive in one streaming pass.
+
+        Scores are saturated term frequencies of the query's terms (no IDF,
+        which would need a second pass).
+        """
+        terms = set(tokenize(query))
+        if not terms or limit <= 0:
+            return []
+        best: List[Tuple[float, int, object]] = []
+        for position, memory in enumerate(self.iter_archive()):
+            counts = {}
+            for term in tokenize(memory.content):
+                if term in terms:
+                    counts[term] = counts.get(term, 0) + 1
+            if not counts:
+                continue
+            score = sum(tf * (k1 + 1.0) / (tf + k1) for tf in counts.values())
+            # Later (more recently archived) memories win ties
+            entry = (score, position, memory)
+            if len(best) < limit:
+                heapq.heappush(best, entry)
+            elif entry[:2] > best[0][:2]:
+                heapq.heapreplace(best, entry)
+        return [memory for _, _, memory in sorted(best, key=lambda e: e[:2], reverse=True)]
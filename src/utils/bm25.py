@@ -0,0 +1,90 @@
+"""
+BM25 keyword search over a character's memory stream.
+
+An inverted index (term -> {memory: term frequency}) is kept up to date as
+memories are added and pruned, so a query only touches the postings of its
+own terms instead of re-tokenising every memory.
+"""
+import heapq
+import math
+from typing import Dict, List
+
+from src.utils.text_sketch import tokenize
+
+
+class BM25Index:
+    """Incrementally maintained inverted index with BM25 scoring."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            k1: Term-frequency saturation
+            b: Strength of document-length normalisation
+        """
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}  # term -> {id(memory): tf}
+        self.memories: Dict[int, object] = {}  # id(memory) -> memory, insertion ordered
+        self._lengths: Dict[int, int] = {}
+        self._terms: Dict[int, tuple] = {}  # distinct terms, so removal needn't re-tokenise
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.memories)
+
+    def add(self, memory):
+        key = id(memory)
+        if key in self.memories:
+            return
+        terms = tokenize(memory.content)
+        counts: Dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[key] = tf
+        self.memories[key] = memory
+        self._lengths[key] = len(terms)
+        self._terms[key] = tuple(counts)
+        self._total_length += len(terms)
+
+    def remove(self, memory):
+        key = id(memory)
+        if self.memories.pop(key, None) is None:
+            return
+        for term in self._terms.pop(key):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(key, None)
+                if not docs:
+                    del self.postings[term]
+        self._total_length -= self._lengths.pop(key)
+
+    def search(self, query: str, top_k: int = 5, pad: bool = True) -> List:
+        """
+        Best-matching memories first; if fewer than top_k match (and `pad`
+        is set), the most recent non-matching memories fill the remaining places.
+        """
+        count = len(self.memories)
+        if count == 0:
+            return []
+        avg_length = self._total_length / count or 1.0
+
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1.0 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for key, tf in docs.items():
+                norm = self.k1 * (1.0 - self.b + self.b * self._lengths[key] / avg_length)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        results = [self.memories[key] for key, _ in best]
+        if pad and len(results) < top_k:
+            for key in reversed(self.memories):
+                if key not in scores:
+                    results.append(self.memories[key])
+                    if len(results) == top_k:
+                        break
+        return results
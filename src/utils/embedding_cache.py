@@ -0,0 +1,198 @@
+"""
+Process-wide embedding cache.
+
+Memories are copied to every character present at an interaction, so the
+same text shows up in many memory streams. Embeddings are cached once per
+process, keyed by a hash of (embedding model, text), with a byte-size cap
+and least-recently-used eviction.
+
+The cache is backed by an append-only file of fixed-layout records:
+    16-byte key | uint32 dimension | dimension x float32
+which is memory-mapped on startup, so cached vectors survive restarts
+without being parsed or copied. Once evictions leave the file mostly dead
+records it is rewritten with only the live entries.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.config_loader import ConfigLoader
+
+
+KEY_SIZE = 16
+_HEADER = struct.Struct(f"<{KEY_SIZE}sI")
+
+
+def embedding_key(model: str, text: str) -> bytes:
+    """Cache key for one text under one embedding model."""
+    return hashlib.blake2b(f"{model}\0{text}".encode("utf-8"), digest_size=KEY_SIZE).digest()
+
+
+class EmbeddingCache:
+    """Thread-safe LRU cache of float32 embeddings with file persistence."""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            path: Backing file (None = in-memory only)
+            max_bytes: Cap on the total size of cached vectors
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._file_bytes = 0
+        self._mmap: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+        if path:
+            self._load()
+
+    def get_many(self, model: str, texts: List[str]) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """
+        Look up several texts at once.
+
+        Returns:
+            ({text: vector} for hits, [texts that missed] without duplicates)
+        """
+        found = {}
+        missing = []
+        with self._lock:
+            for text in texts:
+                if text in found:
+                    continue
+                key = embedding_key(model, text)
+                vector = self._entries.get(key)
+                if vector is None:
+                    if text not in missing:
+                        missing.append(text)
+                    continue
+                self._entries.move_to_end(key)
+                found[text] = vector
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        """Store one vector per text, persisting and evicting as needed."""
+        records = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = embedding_key(model, text)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    continue
+                array = np.asarray(vector, dtype=np.float32)
+                self._insert(key, array)
+                records.append(_HEADER.pack(key, len(array)) + array.tobytes())
+            self._evict()
+            if self.path and records:
+                self._append(records)
+
+    def clear(self):
+        """Drop every entry, including the backing file."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._close_mmap()
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+            self._file_bytes = 0
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "file_bytes": self._file_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def _insert(self, key: bytes, array: np.ndarray):
+        self._entries[key] = array
+        self._bytes += array.nbytes
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, array = self._entries.popitem(last=False)
+            self._bytes -= array.nbytes
+
+    def _load(self):
+        """Map the backing file and index its records (lock not needed yet)."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._file_bytes = len(self._mmap)
+
+        offset = 0
+        while offset + _HEADER.size <= self._file_bytes:
+            key, dim = _HEADER.unpack_from(self._mmap, offset)
+            start = offset + _HEADER.size
+            end = start + dim * 4
+            if end > self._file_bytes:
+                break  # Truncated tail from an interrupted write
+            # Zero-copy view into the mapped file
+            vector = np.frombuffer(self._mmap, dtype=np.float32, count=dim, offset=start)
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key).nbytes
+            self._insert(key, vector)
+            offset = end
+        self._evict()
+
+    def _append(self, records: List[bytes]):
+        """Append records to the backing file, compacting it when mostly dead (lock held)."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = b"".join(records)
+        if self._file_bytes + len(data) > 2 * max(self.max_bytes, self._bytes):
+            self._compact()
+            return
+        with open(self.path, "ab") as f:
+            f.write(data)
+        self._file_bytes += len(data)
+
+    def _compact(self):
+        """Rewrite the backing file with only live entries (lock held)."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            for key, array in self._entries.items():
+                f.write(_HEADER.pack(key, len(array)))
+                f.write(array.tobytes())
+        # Copy out of the old mapping before it goes away
+        live = OrderedDict((key, np.array(array)) for key, array in self._entries.items())
+        self._close_mmap()
+        os.replace(tmp_path, self.path)
+        self._entries = live
+        self._file_bytes = os.path.getsize(self.path)
+
+    def _close_mmap(self):
+        # Vectors may still be views into the mapping, so it is released by
+        # dropping the reference rather than closed outright
+        self._mmap = None
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache(config: Optional[ConfigLoader] = None) -> EmbeddingCache:
+    """Process-wide cache, configured from `memory.embedding_cache` on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            config = config or ConfigLoader()
+            _cache = EmbeddingCache(
+                path=config.get("memory.embedding_cache.path", "./data/cache/embeddings.bin"),
+                max_bytes=int(config.get("memory.embedding_cache.max_mb", 64) * 1024 * 1024)
+            )
+        return _cache
@@ -2,43 +2,154 @@
 Semantic memory search using embeddings.
 Inspired by AI Town's memory retrieval system.
 """
-import math
 import os
-from typing import List, Optional, Tuple
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from src.models.character import Memory
+from src.llm.providers import LLMProvider, create_provider
+from src.llm.gateway import Priority, gate
+from src.utils.embedding_cache import EmbeddingCache, get_embedding_cache
+from src.utils.retrieval import retrieval_scores
+from src.utils.text_sketch import SketchIndex, top_k_indices
+
+
+class EmbeddingIndex:
+    """
+    One character's memory embeddings as a contiguous float32 matrix.
+
+    Rows are unit-normalised, so cosine similarity against a normalised
+    query is a single matrix-vector product. Rows are appended in batches
+    and never move, so `rows` maps memory content to a stable row number.
+    """
+
+    def __init__(self):
+        self.matrix: Optional[np.ndarray] = None  # capacity x dim, first `size` rows used
+        self.size = 0
+        self.rows: Dict[str, int] = {}
+
+    def missing(self, texts: List[str]) -> List[str]:
+        """Texts (deduplicated, in order) that have no row yet."""
+        return list(dict.fromkeys(t for t in texts if t not in self.rows))
+
+    def add(self, texts: List[str], vectors: List[List[float]]):
+        """Append one row per text."""
+        if not texts:
+            return
+        block = _normalise(np.asarray(vectors, dtype=np.float32))
+        if self.matrix is None:
+            self.matrix = np.empty((max(64, len(texts)), block.shape[1]), dtype=np.float32)
+        needed = self.size + len(texts)
+        if needed > self.matrix.shape[0]:
+            # Grow geometrically so appends stay amortised O(1)
+            grown = np.empty((max(needed, 2 * self.matrix.shape[0]), self.matrix.shape[1]),
+                             dtype=np.float32)
+            grown[:self.size] = self.matrix[:self.size]
+            self.matrix = grown
+        self.matrix[self.size:needed] = block
+        for offset, text in enumerate(texts):
+            self.rows[text] = self.size + offset
+        self.size = needed
+
+    def similarities(self, texts: List[str], query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each text's row to a normalised query vector."""
+        scores = self.matrix[:self.size] @ query
+        return scores[np.fromiter((self.rows[t] for t in texts), dtype=np.intp, count=len(texts))]
+
+    def compact(self, live_texts: List[str]):
+        """Drop rows for memories that have been pruned."""
+        keep = list(dict.fromkeys(t for t in live_texts if t in self.rows))
+        if len(keep) == self.size:
+            return
+        order = np.fromiter((self.rows[t] for t in keep), dtype=np.intp, count=len(keep))
+        self.matrix = self.matrix[order].copy() if len(keep) else None
+        self.rows = {t: i for i, t in enumerate(keep)}
+        self.size = len(keep)
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    """Scale vectors (rows) to unit length; zero vectors stay zero."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _columns(memories: List[Memory], sketches: Optional[SketchIndex] = None):
+    """(memories, importance, timestamps) arrays, reusing the sketch index's columns."""
+    if sketches is not None and len(sketches) == len(memories):
+        count = len(sketches)
+        return sketches.memories, sketches.importance[:count], sketches.timestamps[:count]
+    importance = np.fromiter((m.importance for m in memories), dtype=np.float32,
+                             count=len(memories))
+    timestamps = np.fromiter((m.timestamp.timestamp() for m in memories), dtype=np.float64,
+                             count=len(memories))
+    return memories, importance, timestamps
 
 
 class MemorySearchEngine:
     """Search character memories using semantic similarity."""
 
-    def __init__(self, use_embeddings: bool = True, api_key: Optional[str] = None):
+    def __init__(self, use_embeddings: bool = True, api_key: Optional[str] = None,
+                 provider: Optional[LLMProvider] = None,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 priority: Priority = Priority.INTERACTIVE):
         """
         Args:
-            use_embeddings: Use embeddings for semantic search (requires API key)
+            use_embeddings: Use embeddings for semantic search (requires a provider)
             api_key: OpenAI API key for embeddings
+            provider: Explicit embedding backend. Defaults to llm.provider in config.
+            embedding_cache: Where embeddings are cached. Defaults to the
+                process-wide cache shared by every engine.
+            priority: Gateway class for embedding calls unless a search asks
+                for another (retrieval inside live ticks is INTERACTIVE)
         """
         self.use_embeddings = use_embeddings
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
-        self.embedding_cache = {}  # Cache embeddings to avoid re-computing
+        self.provider = provider
+        self.embedding_cache = embedding_cache or get_embedding_cache()
+        self.indexes: Dict[str, EmbeddingIndex] = {}  # owner id -> memory embeddings
+
+        if use_embeddings and self.provider is None:
+            try:
+                self.provider = create_provider(api_key=self.api_key)
+            except ValueError as e:
+                print(f"⚠️  {e}. Using offline fallback.")
+
+        self.priority = Priority(priority)
+        self._ungated_provider = self.provider
+        self.provider = gate(self.provider, self.priority)
 
-        if use_embeddings and not self.api_key:
-            print("⚠️  No API key for embeddings. Using keyword fallback.")
+        if use_embeddings and (self.provider is None or not self.provider.is_available):
+            print("⚠️  No embedding provider available. Using offline fallback.")
             self.use_embeddings = False
 
     def search_relevant_memories(
         self,
         memories: List[Memory],
         query: str,
-        top_k: int = 5
+        top_k: int = 5,
+        owner_id: str = "default",
+        sketches: Optional[SketchIndex] = None,
+        now: Optional[datetime] = None,
+        priority: Optional[Priority] = None
     ) -> List[Memory]:
         """
         Search memories for those most relevant to the query.
 
+        Results are ranked by relevance, importance and recency (decaying
+        relative to `now`, the current simulated time).
+
         Args:
             memories: List of memories to search
             query: What to search for (e.g., "interactions about lost things")
             top_k: How many memories to return
+            owner_id: Whose memories these are (each owner gets its own index)
+            sketches: Precomputed text sketches of exactly these memories,
+                used instead of keyword matching when embeddings are off
+            now: Current simulated time (default: the newest memory's time)
+            priority: Gateway class for any embedding call (default: the engine's)
 
         Returns:
             List of most relevant memories
@@ -47,99 +158,101 @@ class MemorySearchEngine:
             return []
 
         if self.use_embeddings:
-            return self._search_with_embeddings(memories, query, top_k)
+            return self._search_with_embeddings(memories, query, top_k, owner_id, sketches, now,
+                                                priority)
         else:
-            return self._search_with_keywords(memories, query, top_k)
+            return self._search_offline(memories, query, top_k, sketches, now)
 
     def _search_with_embeddings(
         self,
         memories: List[Memory],
         query: str,
-        top_k: int
+        top_k: int,
+        owner_id: str = "default",
+        sketches: Optional[SketchIndex] = None,
+        now: Optional[datetime] = None,
+        priority: Optional[Priority] = None
     ) -> List[Memory]:
         """Use embeddings for semantic similarity search."""
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=self.api_key)
-
-            # Get query embedding
-            query_embedding = self._get_embedding(query, client)
+            index = self.indexes.setdefault(owner_id, EmbeddingIndex())
+            memories, importance, timestamps = _columns(memories, sketches)
+            texts = [m.content for m in memories]
 
-            # Score each memory by similarity
-            scored_memories = []
-            for memory in memories:
-                memory_embedding = self._get_embedding(memory.content, client)
-                similarity = self._cosine_similarity(query_embedding, memory_embedding)
+            # Query plus every memory not yet indexed, in at most one provider call
+            new_texts = index.missing(texts)
+            vectors = self._get_embeddings(new_texts + [query], priority)
+            index.add(new_texts, [vectors[t] for t in new_texts])
+            if index.size > 2 * len(texts):
+                index.compact(texts)
+            query_vector = _normalise(vectors[query])
 
-                # Weight by importance and recency
-                recency_weight = 0.3  # Recent memories get boost
-                importance_weight = memory.importance / 10.0
+            similarity = index.similarities(texts, query_vector)
+            scores = retrieval_scores(similarity, importance, timestamps, now)
 
-                final_score = similarity + (recency_weight * 0.1) + (importance_weight * 0.2)
-                scored_memories.append((final_score, memory))
-
-            # Sort by score and return top k
-            scored_memories.sort(reverse=True, key=lambda x: x[0])
-            return [mem for score, mem in scored_memories[:top_k]]
+            return [memories[i] for i in top_k_indices(scores, top_k)]
 
         except Exception as e:
-            print(f"Embedding search failed: {e}. Using keyword fallback.")
-            return self._search_with_keywords(memories, query, top_k)
-
-    def _get_embedding(self, text: str, client) -> List[float]:
-        """Get embedding for text, with caching."""
-        if text in self.embedding_cache:
-            return self.embedding_cache[text]
-
-        response = client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text
-        )
-        embedding = response.data[0].embedding
-        self.embedding_cache[text] = embedding
-        return embedding
-
-    def _cosine_similarity(self, a: List[float], b: List[float]) -> float:
-        """Calculate cosine similarity between two vectors without numpy."""
-        if not a or not b:
-            return 0.0
-
-        dot_product = sum(x * y for x, y in zip(a, b))
-        norm_a = math.sqrt(sum(x * x for x in a))
-        norm_b = math.sqrt(sum(x * x for x in b))
+            print(f"Embedding search failed: {e}. Using offline fallback.")
+            return self._search_offline(memories, query, top_k, sketches, now)
 
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
+    def _search_offline(
+        self,
+        memories: List[Memory],
+        query: str,
+        top_k: int,
+        sketches: Optional[SketchIndex] = None,
+        now: Optional[datetime] = None
+    ) -> List[Memory]:
+        """Hashed TF-IDF sketches when the caller has them, keywords otherwise."""
+        if sketches is not None and len(sketches) == len(memories):
+            return sketches.search(query, top_k, now)
+        return self._search_with_keywords(memories, query, top_k, now)
 
-        return float(dot_product / (norm_a * norm_b))
+    def _get_embeddings(self, texts: List[str],
+                        priority: Optional[Priority] = None) -> Dict[str, np.ndarray]:
+        """Embeddings for texts, from the shared cache or one batched provider call."""
+        provider = self.provider
+        if priority is not None and priority != self.priority:
+            provider = gate(self._ungated_provider, priority)
+        model = provider.embedding_model
+        found, missing = self.embedding_cache.get_many(model, texts)
+        if missing:
+            vectors = provider.embed(missing)
+            self.embedding_cache.put_many(model, missing, vectors)
+            found.update(zip(missing, (np.asarray(v, dtype=np.float32) for v in vectors)))
+        return found
 
     def _search_with_keywords(
         self,
         memories: List[Memory],
         query: str,
-        top_k: int
+        top_k: int,
+        now: Optional[datetime] = None
     ) -> List[Memory]:
         """Fallback: Simple keyword matching."""
         query_words = set(query.lower().split())
 
-        scored_memories = []
-        for memory in memories:
-            memory_words = set(memory.content.lower().split())
+        # Count matching words
+        matches = np.fromiter(
+            (len(query_words.intersection(m.content.lower().split())) for m in memories),
+            dtype=np.float32, count=len(memories)
+        )
+        memories, importance, timestamps = _columns(memories)
+        scores = retrieval_scores(matches, importance, timestamps, now)
+        return [memories[i] for i in top_k_indices(scores, top_k)]
 
-            # Count matching words
-            matches = len(query_words.intersection(memory_words))
+    def clear_cache(self):
+        """Drop this engine's memory indexes (the shared embedding cache is kept)."""
+        self.indexes = {}
 
-            # Weight by importance and recency
-            importance_weight = memory.importance / 10.0
-            recency_boost = 0.5  # Recent memories slightly preferred
 
-            score = matches + importance_weight + recency_boost
-            scored_memories.append((score, memory))
+_shared_engine: Optional[MemorySearchEngine] = None
 
-        # Sort by score and return top k
-        scored_memories.sort(reverse=True, key=lambda x: x[0])
-        return [mem for score, mem in scored_memories[:top_k]]
 
-    def clear_cache(self):
-        """Clear the embedding cache."""
-        self.embedding_cache = {}
+def get_memory_search_engine() -> MemorySearchEngine:
+    """Engine shared by all characters, so indexes and cached embeddings persist."""
+    global _shared_engine
+    if _shared_engine is None:
+        _shared_engine = MemorySearchEngine(use_embeddings=True)
+    return _shared_engine
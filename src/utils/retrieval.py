@@ -0,0 +1,51 @@
+"""
+Retrieval scoring for memory search.
+
+A memory's score combines how relevant it is to the query, how important
+it was, and how recently it happened, with recency decaying exponentially
+in simulated time (relative to WorldState.current_time, or to the newest
+memory when no clock is given). Everything is computed over numpy arrays,
+so ranking a whole stream costs a few vector operations.
+"""
+import math
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+
+RELEVANCE_WEIGHT = 1.0
+IMPORTANCE_WEIGHT = 0.2  # applied to importance / 10
+RECENCY_WEIGHT = 0.3
+HALF_LIFE_HOURS = 6.0  # simulated hours until the recency term halves
+
+
+def recency(timestamps: np.ndarray, now: float,
+            half_life_hours: float = HALF_LIFE_HOURS) -> np.ndarray:
+    """exp decay in [0, 1] of epoch-second timestamps relative to `now`."""
+    age_hours = np.maximum(now - timestamps, 0.0) / 3600.0
+    return np.exp(-math.log(2) * age_hours / half_life_hours)
+
+
+def retrieval_scores(
+    relevance: np.ndarray,
+    importance: np.ndarray,
+    timestamps: np.ndarray,
+    now: Optional[datetime] = None,
+    half_life_hours: float = HALF_LIFE_HOURS
+) -> np.ndarray:
+    """
+    Combined score per memory.
+
+    Args:
+        relevance: Query relevance (cosine similarity, BM25, match counts...)
+        importance: Memory importance, 0-10
+        timestamps: Memory times as epoch seconds
+        now: Current simulated time (default: the newest timestamp)
+    """
+    if len(timestamps) == 0:
+        return np.zeros(0, dtype=np.float32)
+    reference = now.timestamp() if now is not None else float(timestamps.max())
+    return (RELEVANCE_WEIGHT * relevance
+            + IMPORTANCE_WEIGHT * importance / 10.0
+            + RECENCY_WEIGHT * recency(timestamps, reference, half_life_hours))
@@ -0,0 +1,195 @@
+"""
+Offline semantic-ish text matching with hashed TF-IDF sketches.
+
+Used when no embedding provider is available. Each memory's text is
+sketched once: stemmed words and character trigrams are hashed into
+N_FEATURES buckets with sublinear term frequency. Sketches are kept sparse
+(the few dozen buckets a sentence touches) and are shared by every
+character remembering the same MemoryRecord. Queries are scored against a
+character's memories with one IDF-weighted cosine pass, so "arguing" still
+finds "argued" and rare words count for more than common ones, at a few
+microseconds per memory.
+"""
+import math
+import re
+import zlib
+from functools import lru_cache
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.retrieval import retrieval_scores
+
+
+N_FEATURES = 1024
+TRIGRAM_WEIGHT = 0.5  # Trigrams catch spelling variants; whole words matter more
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_SUFFIXES = ("ingly", "ings", "ing", "edly", "ed", "ies", "es", "ly", "s")
+
+
+def stem(word: str) -> str:
+    """Crude suffix stripping ("arguing" -> "argu", "argued" -> "argu")."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, stemmed word tokens."""
+    return [stem(word) for word in _WORD_RE.findall(text.lower())]
+
+
+def _bucket(token: str) -> int:
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(token.encode("utf-8")) % N_FEATURES
+
+
+@lru_cache(maxsize=20000)
+def _word_features(word: str) -> tuple:
+    """(bucket, weight) pairs for one word: its stem plus its trigrams."""
+    features = [(_bucket("w:" + stem(word)), 1.0)]
+    padded = f" {word} "
+    features.extend((_bucket("c:" + padded[i:i + 3]), TRIGRAM_WEIGHT)
+                    for i in range(len(padded) - 2))
+    return tuple(features)
+
+
+def sketch_features(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sparse hashed, sublinear-TF sketch of a piece of text: (buckets, weights),
+    buckets ascending. A sentence touches a few dozen of the N_FEATURES buckets.
+    """
+    counts: Dict[int, float] = {}
+    for word in _WORD_RE.findall(text.lower()):
+        for bucket, weight in _word_features(word):
+            counts[bucket] = counts.get(bucket, 0.0) + weight
+    buckets = np.fromiter(sorted(counts), dtype=np.uint16, count=len(counts))
+    weights = np.fromiter((1.0 + math.log(counts[b]) if counts[b] >= 1.0 else counts[b]
+                           for b in buckets.tolist()), dtype=np.float32, count=len(counts))
+    return buckets, weights
+
+
+def sketch_text(text: str) -> np.ndarray:
+    """The sketch as a dense N_FEATURES vector."""
+    vector = np.zeros(N_FEATURES, dtype=np.float32)
+    buckets, weights = sketch_features(text)
+    vector[buckets] = weights
+    return vector
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+# Shared read-only placeholders for indexes that have no rows yet
+_NO_VALUES = np.zeros(0, dtype=np.float32)
+_NO_FEATURES = np.zeros(N_FEATURES, dtype=np.float32)
+for _array in (_NO_VALUES, _NO_FEATURES):
+    _array.flags.writeable = False
+
+
+class SketchIndex:
+    """
+    One character's memories as rows: a sparse sketch per row (shared with
+    the memory's record) plus importance and timestamp columns for
+    retrieval scoring.
+    """
+
+    def __init__(self):
+        # Arrays are allocated on first add; most characters in a big world
+        # remember nothing until they are first simulated
+        self.sketches: List[Tuple[np.ndarray, np.ndarray]] = []  # row -> (buckets, weights)
+        self.importance = _NO_VALUES
+        self.timestamps = _NO_VALUES  # epoch seconds
+        self.doc_freq = _NO_FEATURES
+        self.memories: List = []  # row -> memory
+        self._rows: Dict[int, int] = {}  # id(memory) -> row
+        self._flat = None  # (row of each entry, buckets, weights), rebuilt after changes
+
+    def __len__(self) -> int:
+        return len(self.memories)
+
+    def add(self, memory):
+        """Append a memory as a new row, using its record's sketch."""
+        if id(memory) in self._rows:
+            return
+        row = len(self.memories)
+        if row == self.importance.shape[0]:
+            if row == 0:
+                self.doc_freq = np.zeros(N_FEATURES, dtype=np.float32)
+            size = max(8, 2 * row)
+            self.importance = np.resize(self.importance, size).astype(np.float32)
+            self.timestamps = np.resize(self.timestamps, size).astype(np.float64)
+        sketch = memory.record.sketch
+        self.sketches.append(sketch)
+        self.importance[row] = memory.importance
+        self.timestamps[row] = memory.timestamp.timestamp()
+        self.doc_freq[sketch[0]] += 1
+        self.memories.append(memory)
+        self._rows[id(memory)] = row
+        self._flat = None
+
+    def remove(self, memory):
+        """Drop a memory's row (the last row moves into its place)."""
+        row = self._rows.pop(id(memory), None)
+        if row is None:
+            return
+        self.doc_freq[self.sketches[row][0]] -= 1
+        last = len(self.memories) - 1
+        if row != last:
+            moved = self.memories[last]
+            self.sketches[row] = self.sketches[last]
+            self.importance[row] = self.importance[last]
+            self.timestamps[row] = self.timestamps[last]
+            self.memories[row] = moved
+            self._rows[id(moved)] = row
+        self.sketches.pop()
+        self.memories.pop()
+        self._flat = None
+
+    def _flattened(self):
+        """Every row's sketch entries concatenated, with the row each belongs to."""
+        if self._flat is None:
+            lengths = [len(buckets) for buckets, _ in self.sketches]
+            self._flat = (
+                np.repeat(np.arange(len(lengths)), lengths),
+                np.concatenate([buckets for buckets, _ in self.sketches]),
+                np.concatenate([weights for _, weights in self.sketches]),
+            )
+        return self._flat
+
+    def vectors(self, memories: List) -> np.ndarray:
+        """Dense sketch rows for the given (indexed) memories, in order."""
+        dense = np.zeros((len(memories), N_FEATURES), dtype=np.float32)
+        for i, memory in enumerate(memories):
+            buckets, weights = self.sketches[self._rows[id(memory)]]
+            dense[i, buckets] = weights
+        return dense
+
+    def search(self, query: str, top_k: int = 5, now: Optional[datetime] = None) -> List:
+        """Best memories for the query by relevance, importance and recency."""
+        count = len(self.memories)
+        if count == 0:
+            return []
+        idf = np.log((1.0 + count) / (1.0 + self.doc_freq)) + 1.0
+        weighted_query = sketch_text(query) * idf
+        query_norm = np.linalg.norm(weighted_query)
+        relevance = np.zeros(count, dtype=np.float32)
+        if query_norm > 0:
+            rows, buckets, weights = self._flattened()
+            weighted = weights * idf[buckets]
+            dots = np.bincount(rows, weighted * weighted_query[buckets], minlength=count)
+            norms = np.sqrt(np.bincount(rows, weighted * weighted, minlength=count))
+            norms[norms == 0] = 1.0
+            relevance = dots / (norms * query_norm)
+
+        scores = retrieval_scores(relevance, self.importance[:count], self.timestamps[:count], now)
+
+        return [self.memories[i] for i in top_k_indices(scores, top_k)]
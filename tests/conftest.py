@@ -0,0 +1,61 @@
+"""
+Shared fixtures. Run the suite from the repository root:
+
+    python -m pytest
+"""
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.engine import memory_consolidation, prompt_extractor  # noqa: E402
+from src.engine.world_state import WorldState  # noqa: E402
+from src.generators import description_generator  # noqa: E402
+from src.llm.providers import LLMProvider  # noqa: E402
+from src.utils import memory_search  # noqa: E402
+
+DATA_DIR = os.path.join(ROOT, 'data')
+
+
+@pytest.fixture
+def world():
+    """A fresh world from the repository's data files (no journals, no store)."""
+    characters, locations = WorldState.load_world(DATA_DIR)
+    return WorldState(characters, locations)
+
+
+class FakeProvider(LLMProvider):
+    """Records calls; chat answers `reply` after `delay` seconds, embed returns fixed vectors."""
+
+    name = "fake"
+
+    def __init__(self, reply: str = "{}", delay: float = 0.0):
+        super().__init__("fake", "fake-embedding", 60.0)
+        self.reply = reply
+        self.delay = delay
+        self.chats = []
+        self.embeds = []
+
+    def chat(self, messages, **params):
+        self.chats.append(params)
+        time.sleep(self.delay)
+        return self.reply
+
+    def embed(self, texts):
+        self.embeds.append(list(texts))
+        return [[1.0, 0.0] for _ in texts]
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Every provider created through create_provider() is this one FakeProvider."""
+    provider = FakeProvider()
+    for module in (description_generator, memory_consolidation, memory_search, prompt_extractor):
+        monkeypatch.setattr(module, 'create_provider', lambda *args, **kwargs: provider)
+    monkeypatch.setattr(memory_search, '_shared_engine', None)
+    return provider
@@ -0,0 +1,46 @@
+import gzip
+import importlib
+import json
+
+import pytest
+
+
+@pytest.fixture
+def client(world, monkeypatch, tmp_path):
+    # Importing the app initializes a world; keep its relative
+    # ./data/ outputs (interaction store, journals) out of the checkout
+    monkeypatch.chdir(tmp_path)
+    app_module = importlib.import_module("src.api.app")
+    monkeypatch.setattr(app_module, "world_state", world)
+    monkeypatch.setattr(app_module, "current_simulation", None)
+    monkeypatch.setattr(app_module, "_response_cache", {})
+    return app_module.app.test_client()
+
+
+def test_encodings_get_distinct_etags(client, world):
+    zipped = client.get("/api/map/view", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/api/map/view")
+
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in plain.headers
+    assert zipped.headers["ETag"] != plain.headers["ETag"]
+    assert plain.headers["ETag"] == f'"{world.world_id}-{world.seq}"'
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+    assert "Accept-Encoding" in plain.headers["Vary"]
+    assert json.loads(gzip.decompress(zipped.data)) == plain.get_json()
+
+
+def test_each_etag_revalidates_until_the_world_changes(client, world):
+    for headers in ({"Accept-Encoding": "gzip"}, {}):
+        first = client.get("/api/map/view", headers=headers)
+        etag = first.headers["ETag"]
+
+        again = client.get("/api/map/view", headers={**headers, "If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.headers["ETag"] == etag
+        assert again.data == b""
+
+    world.mark_changed()
+    changed = client.get("/api/map/view", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
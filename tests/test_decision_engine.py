@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from src.engine.simulation import Simulation, SimulationConfig
+
+
+def test_template_run_makes_no_embedding_calls(world, fake_llm):
+    # Every character shares one location, so decisions keep recalling meetings
+    simulation = Simulation(world, SimulationConfig(), use_llm=False)
+    location = next(iter(world.locations))
+    simulation.seed_scenario({char_id: location for char_id in list(world.characters)[:3]})
+
+    simulation.run_simulation(600)
+
+    assert any(char.memory_stream for char in world.characters.values())
+    assert fake_llm.embeds == []
+    assert fake_llm.chats == []
+
+
+def test_recall_prefers_meetings_with_the_target(world):
+    simulation = Simulation(world, SimulationConfig(randomness=0.0, autonomy_level=1.0))
+    location = next(iter(world.locations))
+    first, second = list(world.characters.values())[:2]
+    simulation.seed_scenario({first.id: location, second.id: location})
+    simulation.run_simulation(300)
+
+    meetings = simulation.decision_engine._recall_meetings(
+        first, second, world.current_time + timedelta(minutes=1))
+
+    assert meetings
+    assert all(second.id in m.other_characters for m in meetings)
@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+from src.llm.gateway import GatewayTimeout, LLMGateway, Priority
+from src.llm.providers import LLMProvider
+
+
+def test_interactive_slots_are_reserved():
+    gateway = LLMGateway(max_concurrent=2, class_limits={Priority.BACKGROUND: 2},
+                         interactive_reserved=1)
+    with gateway.slot(Priority.BACKGROUND):
+        # The one shared slot is taken; only interactive work may use the other
+        with pytest.raises(GatewayTimeout):
+            with gateway.slot(Priority.BACKGROUND, timeout=0.05):
+                pass
+        with gateway.slot(Priority.INTERACTIVE, timeout=0.05):
+            pass
+
+
+def test_waiters_are_served_by_priority():
+    gateway = LLMGateway(max_concurrent=1)
+    served = []
+    hold = gateway.slot(Priority.INTERACTIVE)
+    hold.__enter__()
+
+    def wait(priority):
+        with gateway.slot(priority):
+            served.append(priority)
+
+    threads = [threading.Thread(target=wait, args=(p,))
+               for p in (Priority.BACKGROUND, Priority.EXTRACTION, Priority.INTERACTIVE)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)  # Queue them in this (worst) order
+    hold.__exit__(None, None, None)
+    for thread in threads:
+        thread.join(1)
+    assert served == [Priority.INTERACTIVE, Priority.EXTRACTION, Priority.BACKGROUND]
+
+
+def test_timed_out_waiter_leaves_the_queue():
+    gateway = LLMGateway(max_concurrent=1)
+    with gateway.slot(Priority.INTERACTIVE):
+        started = time.monotonic()
+        with pytest.raises(GatewayTimeout):
+            gateway.submit(lambda: None, Priority.INTERACTIVE, timeout=0.1)
+        assert time.monotonic() - started < 1
+        assert gateway.get_stats()["interactive"]["waiting"] == 0
+    assert gateway.submit(lambda: "ran", Priority.INTERACTIVE, timeout=0.1) == "ran"
+
+
+class _Recorder(LLMProvider):
+    def __init__(self):
+        super().__init__("recorder", None, 60.0)
+        self.timeouts = []
+
+    def chat(self, messages, **params):
+        self.timeouts.append(params.get("timeout"))
+        return "ok"
+
+
+def test_queueing_comes_out_of_the_call_timeout():
+    gateway = LLMGateway(max_concurrent=1)
+    inner = _Recorder()
+    provider = gateway.bind(inner, Priority.INTERACTIVE)
+
+    hold = gateway.slot(Priority.INTERACTIVE)
+    hold.__enter__()
+    threading.Timer(0.3, hold.__exit__, (None, None, None)).start()
+    assert provider.chat([], timeout=2.0) == "ok"
+    assert inner.timeouts[0] < 1.8
+
+    hold = gateway.slot(Priority.INTERACTIVE)
+    with hold:
+        with pytest.raises(GatewayTimeout):
+            provider.chat([], timeout=0.1)
+    assert len(inner.timeouts) == 1
@@ -0,0 +1,37 @@
+import json
+
+from src.engine.simulation import Simulation, SimulationConfig
+from src.models import interaction as interaction_module
+
+
+def _seed(world, simulation):
+    location = next(iter(world.locations))
+    simulation.seed_scenario({char_id: location for char_id in list(world.characters)[:3]})
+
+
+def test_llm_text_is_not_pooled(world, fake_llm):
+    action = "A one-off sentence only the model would write, number 7431."
+    fake_llm.reply = json.dumps({"action": action, "material_details": "Wet brass.",
+                                 "emotional_temperature": "tender"})
+    simulation = Simulation(world, SimulationConfig(llm_paintability_threshold=0,
+                                                    memory_consolidation_interval=0),
+                            use_llm=True)
+    _seed(world, simulation)
+
+    simulation.run_simulation(60)
+
+    assert any(i.action_description == action for i in world.interactions_log)
+    assert action not in interaction_module._text_pool
+
+
+def test_repeated_template_text_is_shared(world):
+    simulation = Simulation(world, SimulationConfig())
+    _seed(world, simulation)
+
+    simulation.run_simulation(600)
+
+    by_text = {}
+    for logged in world.interactions_log:
+        assert logged.material_details in interaction_module._text_pool
+        first = by_text.setdefault(logged.material_details, logged.material_details)
+        assert first is logged.material_details
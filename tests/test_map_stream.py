@@ -0,0 +1,65 @@
+import copy
+import json
+import queue
+
+from src.api.map_stream import MapBroadcaster
+
+
+def _events(subscriber, timeout=1.0):
+    """(event, data) pairs: the first waited for, then whatever else is queued."""
+    messages = [subscriber.get(timeout=timeout)]
+    while True:
+        try:
+            messages.append(subscriber.get(timeout=0.1))
+        except queue.Empty:
+            break
+    events = []
+    for message in messages:
+        event, data = message.strip().split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def _broadcaster(world):
+    broadcaster = MapBroadcaster(lambda w: {"locations": list(w.locations)}, frame_seconds=0.01)
+    broadcaster.attach(world)
+    return broadcaster
+
+
+def test_moves_in_one_frame_are_coalesced(world):
+    broadcaster = _broadcaster(world)
+    subscriber = broadcaster.subscribe()
+    assert _events(subscriber)[0][0] == "snapshot"
+
+    char = next(iter(world.characters.values()))
+    for location_id in list(world.locations)[:3]:
+        char.current_location = location_id
+        world.record_character_changes([char])
+
+    events = _events(subscriber)
+    deltas = [data for event, data in events if event == "delta"]
+    moves = [c for data in deltas for c in data["characters"] if c["id"] == char.id]
+    assert moves[-1]["location_id"] == char.current_location
+    assert len(moves) < 3
+
+
+def test_new_location_resyncs_every_subscriber(world):
+    broadcaster = _broadcaster(world)
+    early = broadcaster.subscribe()
+    _events(early)
+
+    new_location = copy.copy(next(iter(world.locations.values())))
+    new_location.id = "annex"
+    world.locations["annex"] = new_location
+    # A client connecting now sees the annex in its own snapshot...
+    late = broadcaster.subscribe()
+    assert "annex" in _events(late)[0][1]["locations"]
+
+    char = next(iter(world.characters.values()))
+    char.current_location = "annex"
+    world.record_character_changes([char])
+
+    # ...and that must not stop earlier clients from being resynced
+    event, data = _events(early)[-1]
+    assert event == "snapshot"
+    assert "annex" in data["locations"]
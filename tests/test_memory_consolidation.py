@@ -0,0 +1,81 @@
+import time
+from datetime import datetime, timedelta
+
+from src.engine.memory_consolidation import BackgroundConsolidation, MemoryConsolidator
+from src.engine.simulation import Simulation, SimulationConfig
+from src.models.character import Memory
+
+START = datetime(2026, 1, 1, 9, 0)
+
+
+class _SlowSummarizer:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    def summarize(self, character, memories):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"{len(memories)} quiet moments"
+
+
+def _repetitive(character, count: int = 12):
+    for i in range(count):
+        character.add_memory(Memory(START + timedelta(minutes=i), "observation",
+                                    "Parade stands motionless in the space", "plaza",
+                                    importance=2.0))
+
+
+def _wait_for(background, seconds: float = 2.0) -> int:
+    deadline = time.monotonic() + seconds
+    created = 0
+    while time.monotonic() < deadline:
+        created += background.merge_finished()
+        if not background.pending:
+            return created
+        time.sleep(0.01)
+    return created
+
+
+def test_summaries_are_written_off_the_calling_thread(world):
+    character = next(iter(world.characters.values()))
+    _repetitive(character)
+    summarizer = _SlowSummarizer(0.3)
+    background = BackgroundConsolidation(MemoryConsolidator(summarizer=summarizer))
+
+    started = time.monotonic()
+    assert background.schedule([character]) == 1
+    assert time.monotonic() - started < 0.1
+    assert background.merge_finished() == 0  # Still being written
+
+    assert _wait_for(background) == 1
+    assert [m.content for m in character.memory_stream if m.memory_type == "summary"] \
+        == ["7 quiet moments"]
+
+
+def test_cluster_that_changed_meanwhile_is_not_merged(world):
+    character = next(iter(world.characters.values()))
+    _repetitive(character)
+    background = BackgroundConsolidation(MemoryConsolidator(summarizer=_SlowSummarizer(0.2)))
+    background.schedule([character])
+    # A member is merged away by someone else before the summary is ready
+    first = character.memory_stream[0]
+    character.replace_memories([first], Memory(first.timestamp, "summary", "gone", "plaza"))
+
+    assert _wait_for(background) == 0
+    assert [m.content for m in character.memory_stream if m.memory_type == "summary"] == ["gone"]
+
+
+def test_consolidation_does_not_stretch_a_budgeted_run(world, fake_llm):
+    fake_llm.reply = '{"action": "-", "material_details": "-", "emotional_temperature": "tense"}'
+    simulation = Simulation(world, SimulationConfig(memory_consolidation_interval=1),
+                            use_llm=True)
+    simulation.memory_consolidator.summarizer = _SlowSummarizer(0.5)
+    locations = list(world.locations)
+    simulation.seed_scenario({char_id: locations[0] for char_id in world.characters})
+    for character in world.characters.values():
+        _repetitive(character)
+
+    result = simulation.run_simulation(10_000, wall_clock_budget=1.0)
+
+    assert result.wall_clock_seconds < 1.3
@@ -0,0 +1,31 @@
+import os
+from datetime import datetime, timedelta
+
+from src.engine.memory_consolidation import MemoryConsolidator
+from src.engine.world_state import WorldState
+from src.models.character import Memory
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+START = datetime(2026, 1, 1, 9, 0)
+
+
+def _snapshot(character):
+    return [(m.timestamp, m.memory_type, m.content, m.importance)
+            for m in character.memory_stream]
+
+
+def test_replayed_journal_rebuilds_the_same_memories(tmp_path):
+    journal_dir = str(tmp_path)
+    characters, _ = WorldState.load_world(DATA_DIR, journal_dir)
+    character = next(iter(characters.values()))
+    for i in range(80):
+        text = "Parade stands motionless in the space" if i % 2 else f"Moment number {i}"
+        character.add_memory(Memory(START + timedelta(minutes=i), "observation", text,
+                                    "plaza", importance=2.0 + (i % 7)))
+    assert MemoryConsolidator().consolidate(character) > 0
+    expected = _snapshot(character)
+
+    reloaded, _ = WorldState.load_world(DATA_DIR, journal_dir)
+    again = reloaded[character.id]
+    assert not again.memory_journal.loaded  # Nothing read until first use
+    assert _snapshot(again) == expected
@@ -0,0 +1,45 @@
+import json
+
+from src.engine.simulation import Simulation, SimulationConfig
+
+REPLY = json.dumps({
+    "action": "Two figures trade a look across the platform.",
+    "material_details": "Rain beads on a canvas strap.",
+    "emotional_temperature": "tense",
+})
+
+
+def _seeded(world, simulation):
+    locations = list(world.locations)
+    simulation.seed_scenario({char_id: locations[0] for char_id in list(world.characters)[:4]})
+    return simulation
+
+
+def test_budget_shorter_than_provider_timeout_still_uses_llm(world, fake_llm):
+    # The provider's timeout (60 s) is far longer than the budget
+    fake_llm.reply, fake_llm.delay = REPLY, 0.05
+    simulation = _seeded(world, Simulation(
+        world, SimulationConfig(llm_paintability_threshold=0, memory_consolidation_interval=0),
+        use_llm=True))
+
+    result = simulation.run_simulation(10_000, wall_clock_budget=1.0)
+
+    assert fake_llm.chats
+    assert simulation.tick_seconds["llm"] > 0
+    assert result.degraded_ticks < simulation.ticks
+    assert result.wall_clock_seconds < 1.5
+
+
+def test_idle_world_reports_only_simulated_minutes(world):
+    for char in world.characters.values():
+        char.current_location = None
+    simulation = Simulation(world, SimulationConfig())
+    started_at = world.current_time
+
+    result = simulation.run_simulation(60, wall_clock_budget=5)
+
+    assert result.simulated_minutes == 0
+    assert result.remaining_minutes == 60
+    assert not result.completed
+    assert result.continuation_token is None
+    assert world.current_time == started_at
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.models.character import Memory, MemoryRecord
+from src.utils.text_sketch import N_FEATURES, SketchIndex, sketch_text
+
+START = datetime(2026, 1, 1, 9, 0)
+
+
+def _memory(minutes: int, content: str, record=None, owner_id=None) -> Memory:
+    if record is not None:
+        return Memory(importance=5.0, record=record, owner_id=owner_id)
+    return Memory(START + timedelta(minutes=minutes), "observation", content, "market")
+
+
+def test_characters_share_one_sketch_per_record():
+    record = MemoryRecord.shared(1, START, "Two riders argued by the fountain", "plaza",
+                                 ("a", "b"))
+    first, second = SketchIndex(), SketchIndex()
+    first.add(_memory(0, "", record, "a"))
+    second.add(_memory(0, "", record, "b"))
+
+    assert first.sketches[0] is second.sketches[0]
+    buckets, weights = record.sketch
+    assert len(buckets) < N_FEATURES // 4
+    assert np.array_equal(sketch_text(record.content)[buckets], weights)
+    # A handful of memories doesn't reserve room for dozens
+    assert len(first.importance) <= 8
+
+
+def test_search_matches_stems_and_survives_removal():
+    index = SketchIndex()
+    memories = [_memory(0, "They were arguing about the rain"),
+                _memory(1, "A heron waded through the canal"),
+                _memory(2, "Bread and oranges at the market stall")]
+    for memory in memories:
+        index.add(memory)
+
+    assert index.search("argued", top_k=1)[0] is memories[0]
+
+    index.remove(memories[0])
+    assert len(index) == 2
+    assert index.search("heron canal", top_k=1)[0] is memories[1]
+    assert np.array_equal(index.doc_freq > 0,
+                          index.vectors(memories[1:]).astype(bool).any(axis=0))
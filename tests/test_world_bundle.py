@@ -0,0 +1,55 @@
+import os
+import shutil
+
+import pytest
+
+from src.engine import world_bundle
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for section in world_bundle.SECTIONS:
+        shutil.copytree(os.path.join(DATA_DIR, section), tmp_path / section)
+    world_bundle.build_bundle(str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Paths rehashed by the staleness check."""
+    paths = []
+    file_hash = world_bundle._file_hash
+
+    def counting(path):
+        paths.append(path)
+        return file_hash(path)
+
+    monkeypatch.setattr(world_bundle, "_file_hash", counting)
+    return paths
+
+
+def _touch(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_touched_file_is_rehashed_only_once(data_dir, hashed):
+    touched = next((data_dir / "characters").glob("*.json"))
+    _touch(touched)
+
+    assert world_bundle.load_bundle(str(data_dir)) is not None
+    assert hashed == [str(touched)]
+
+    hashed.clear()
+    characters, locations = world_bundle.load_bundle(str(data_dir))
+    assert hashed == []
+    assert all(char.backstory for char in characters.values())
+
+
+def test_edited_file_makes_the_bundle_stale(data_dir):
+    edited = next((data_dir / "locations").glob("*.json"))
+    edited.write_text(edited.read_text().replace('"name"', '"name" ', 1))
+
+    assert world_bundle.load_bundle(str(data_dir)) is None
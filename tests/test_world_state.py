@@ -0,0 +1,34 @@
+from src.engine.simulation import Simulation, SimulationConfig
+
+
+def _run(world, minutes=300):
+    simulation = Simulation(world, SimulationConfig(interaction_density="dense"))
+    location = next(iter(world.locations))
+    simulation.seed_scenario({char_id: location for char_id in list(world.characters)[:3]})
+    simulation.run_simulation(minutes)
+    return world.interactions_log
+
+
+def test_interactions_since_pages_through_the_log(world):
+    log = _run(world)
+    assert len(log) > 10
+
+    for cursor in (0, log[0].seq, log[4].seq, log[4].seq + 1, log[-1].seq):
+        expected = [i for i in log if i.seq > cursor]
+        newer, more = world.interactions_since(cursor, limit=5)
+        assert newer == expected[:5]
+        assert more == (len(expected) > 5)
+
+
+def test_cursor_sees_characters_changed_after_it(world):
+    _run(world, 60)
+    cursor = world.seq
+    assert world.characters_changed_since(cursor) == []
+    assert world.interactions_since(cursor) == ([], False)
+
+    moved = next(c for c in world.characters.values() if c.current_location)
+    moved.current_location = next(loc for loc in world.locations if loc != moved.current_location)
+    world.record_character_changes([moved])
+
+    assert world.seq == cursor + 1
+    assert world.characters_changed_since(cursor) == [moved]
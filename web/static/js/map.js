@@ -4,7 +4,7 @@ let locations = [];
 let characters = [];
 let currentLocationIndex = 0;
 let autoScrollEnabled = false;
-let updateInterval = null;
+let mapWatch = null;
 
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', async () => {
@@ -261,22 +261,22 @@ function updateTimeDisplay() {
 
 // Start auto-update loop
 function startAutoUpdate() {
-    // Update every 5 seconds
-    updateInterval = setInterval(async () => {
-        await loadData();
+    // Positions and moods are pushed as they change (polls if streaming is unavailable)
+    mapWatch = watchMap((latest) => {
+        locations = latest;
         renderDiorama();
         updateTimeDisplay();
 
         if (autoScrollEnabled) {
             followCharacters();
         }
-    }, 5000);
+    });
 }
 
 // Cleanup on page unload
 window.addEventListener('beforeunload', () => {
-    if (updateInterval) {
-        clearInterval(updateInterval);
+    if (mapWatch) {
+        mapWatch.close();
     }
 });
 
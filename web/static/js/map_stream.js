@@ -0,0 +1,63 @@
+// Live map updates pushed from /api/map/stream (Server-Sent Events).
+//
+// watchMap(onUpdate, pollMs) keeps a local copy of the map view, applies the
+// server's character deltas to it and calls onUpdate(locations) after each
+// change. Browsers without EventSource poll /api/map/view every pollMs
+// instead (with If-None-Match, so an unchanged map costs a 304).
+
+function watchMap(onUpdate, pollMs = 5000) {
+    let locations = [];
+
+    function moveCharacter(delta) {
+        locations.forEach(location => {
+            location.characters = location.characters.filter(c => c.id !== delta.id);
+        });
+        const target = locations.find(location => location.id === delta.location_id);
+        if (target) {
+            target.characters.push({
+                id: delta.id,
+                name: delta.name,
+                emotional_state: delta.emotional_state,
+                animal: delta.animal,
+                location: target.name
+            });
+        }
+    }
+
+    if (!window.EventSource) {
+        const poll = async () => {
+            try {
+                const response = await fetch('/api/map/view');
+                if (response.ok) {
+                    const result = await response.json();
+                    if (result.status === 'success') onUpdate(result.locations);
+                }
+            } catch (error) {
+                // Try again next interval
+            }
+        };
+        poll();
+        const timer = setInterval(poll, pollMs);
+        return { close: () => clearInterval(timer) };
+    }
+
+    // EventSource reconnects by itself; each connection opens with a snapshot
+    const source = new EventSource('/api/map/stream');
+    source.addEventListener('snapshot', (e) => {
+        locations = JSON.parse(e.data).locations;
+        onUpdate(locations);
+    });
+    source.addEventListener('delta', (e) => {
+        const delta = JSON.parse(e.data);
+        delta.characters.forEach(moveCharacter);
+        (delta.locations || []).forEach(conditions => {
+            const location = locations.find(l => l.id === conditions.id);
+            if (location) {
+                location.time_of_day = conditions.time_of_day;
+                location.weather = conditions.weather;
+            }
+        });
+        onUpdate(locations);
+    });
+    return source;
+}
@@ -118,7 +118,7 @@ on($('#seed'),'click', async ()=>{
   }
 });
 
-// Run simulation
+// Run simulation (streams partial LLM text as it is generated)
 on($('#run'),'click', async ()=>{
   try {
     $('#statusVal').textContent='running';
@@ -127,20 +127,65 @@ on($('#run'),'click', async ()=>{
 
     const duration = parseInt($('#duration').value);
     
-    const response = await fetch('/api/simulation/run', {
+    const response = await fetch('/api/simulation/run/stream', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ duration_minutes: duration })
     });
 
-    const result = await response.json();
-    
-    if (result.status === 'success') {
-      displayInteractions(result.interactions);
-      updateStatus();
-      toast(`Complete: ${result.interactions_count} interactions`);
-      $('#fps').textContent = 'Complete';
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP ${response.status}`);
+    }
+
+    const container = $('#notes');
+    container.innerHTML = '';
+    let pending = null;
+    let count = 0;
+
+    const handleEvent = (event) => {
+      if (event.type === 'partial' && event.field === 'action') {
+        if (!pending) {
+          pending = document.createElement('li');
+          pending.className = 'note pending';
+          pending.innerHTML = '<p class="note-body"></p>';
+          container.appendChild(pending);
+        }
+        pending.querySelector('.note-body').textContent = event.text;
+      } else if (event.type === 'interaction') {
+        const li = renderNote(event.interaction);
+        if (pending) {
+          container.replaceChild(li, pending);
+          pending = null;
+        } else {
+          container.appendChild(li);
+        }
+        count += 1;
+        $('#fps').textContent = `Simulating... ${count}`;
+      } else if (event.type === 'error') {
+        throw new Error(event.message);
+      }
+    };
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let newline;
+      while ((newline = buffer.indexOf('\n')) >= 0) {
+        const line = buffer.slice(0, newline).trim();
+        buffer = buffer.slice(newline + 1);
+        if (line) handleEvent(JSON.parse(line));
+      }
     }
+
+    if (pending) pending.remove();
+    if (count === 0) displayInteractions([]);
+    updateStatus();
+    toast(`Complete: ${count} interactions`);
+    $('#fps').textContent = 'Complete';
   } catch (error) {
     console.error('Error:', error);
     toast('Error running simulation');
@@ -159,34 +204,39 @@ function displayInteractions(interactions) {
   }
 
   interactions.forEach(interaction => {
-    const li = document.createElement('li');
-    li.className = 'note';
-
-    const time = new Date(interaction.timestamp).toLocaleTimeString('en-US', {
-      hour: '2-digit',
-      minute: '2-digit'
-    });
-
-    const tempClass = interaction.emotional_temperature || 'uncertain';
+    container.appendChild(renderNote(interaction));
+  });
+}
 
-    li.innerHTML = `
-      <div class="note-head">
-        <div class="timestamp">${time}</div>
-        <div class="pill">${interaction.location_name} · ${interaction.time_of_day}</div>
-        ${interaction.is_unexpected ? '<div class="chip emergent">EMERGENT</div>' : ''}
-      </div>
-      <p class="note-body">${interaction.action_description}</p>
-      <div class="aside">
-        <span class="tag">Material details</span>
-        <span class="muted">${interaction.material_details}</span>
-      </div>
-      <div class="temp-line ${tempClass}">
-        <span>Emotional temperature:</span> <strong>${tempClass.charAt(0).toUpperCase() + tempClass.slice(1)}</strong>
-      </div>
-    `;
+// Build a single field note element
+function renderNote(interaction) {
+  const li = document.createElement('li');
+  li.className = 'note';
 
-    container.appendChild(li);
+  const time = new Date(interaction.timestamp).toLocaleTimeString('en-US', {
+    hour: '2-digit',
+    minute: '2-digit'
   });
+
+  const tempClass = interaction.emotional_temperature || 'uncertain';
+
+  li.innerHTML = `
+    <div class="note-head">
+      <div class="timestamp">${time}</div>
+      <div class="pill">${interaction.location_name} · ${interaction.time_of_day}</div>
+      ${interaction.is_unexpected ? '<div class="chip emergent">EMERGENT</div>' : ''}
+    </div>
+    <p class="note-body">${interaction.action_description}</p>
+    <div class="aside">
+      <span class="tag">Material details</span>
+      <span class="muted">${interaction.material_details}</span>
+    </div>
+    <div class="temp-line ${tempClass}">
+      <span>Emotional temperature:</span> <strong>${tempClass.charAt(0).toUpperCase() + tempClass.slice(1)}</strong>
+    </div>
+  `;
+
+  return li;
 }
 
 // Extract paintable moments
@@ -375,18 +425,6 @@ function toast(msg){
   toastTm=setTimeout(()=>el.classList.remove('show'),2000);
 }
 
-// Update map view
-async function updateMap() {
-  try {
-    const response = await fetch('/api/map/view');
-    const result = await response.json();
-    if (result.status === 'success') {
-      displayMap(result.locations);
-    }
-  } catch (error) {
-    // Silent fail - map is optional
-  }
-}
 
 // Display map
 function displayMap(locations) {
@@ -453,8 +491,8 @@ async function exportForLora() {
   }
 }
 
-// Update map every 3 seconds
-setInterval(updateMap, 3000);
+// Keep the map live (pushed updates; polls every 3 seconds without streaming)
+watchMap(displayMap, 3000);
 
 // Expose for custom events (Phase 2)
 window.AgentWorldsUI = {